@@ -1,327 +1,99 @@
-from PyPDF2 import PdfMerger, PdfReader, PdfWriter
-from PIL import Image
 import os
-import comtypes
-import comtypes.client
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.utils import ImageReader
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from tkinterdnd2 import TkinterDnD, DND_FILES
 import time
 import threading
+import queue
 
-# Initialize COM for Word with detailed error handling
-com_available = False
-try:
-    comtypes.CoInitialize()
-    word_test = comtypes.client.CreateObject('Word.Application', dynamic=True)
-    # Try to load type library for constants
-    try:
-        comtypes.client.GetModule(['{000209FF-0000-0000-C000-000000000046}'])
-        from comtypes.gen import Word
-        wdFormatPDF = Word.wdFormatPDF
-    except Exception:
-        wdFormatPDF = 17  # Fallback to hardcoded constant
-    word_test.Quit()
-    com_available = True
-    print("COM module for Word initialized successfully")
-except Exception as e:
-    messagebox.showwarning("Warning", f"Microsoft Word COM initialization failed: {e}. DOCX conversion will be disabled. Ensure Word is installed, run as administrator, and check 32/64-bit compatibility.")
-    print(f"Failed to initialize COM module for Word: {e}")
-    wdFormatPDF = 17
-
-# Function to convert an image (JPG or PNG) to PDF
-def image_to_pdf(image_path, output_pdf):
-    start_time = time.time()
-    try:
-        img = Image.open(image_path)
-        img = img.convert('RGB')
-        img_width, img_height = img.size
-        page_width, page_height = letter
-        scale = min(page_width / img_width, page_height / img_height)
-        new_width, new_height = img_width * scale, img_height * scale
-        x_offset, y_offset = (page_width - new_width) / 2, (page_height - new_height) / 2
-        c = canvas.Canvas(output_pdf, pagesize=letter)
-        c.drawImage(ImageReader(image_path), x_offset, y_offset, width=new_width, height=new_height)
-        c.save()
-        print(f"Converted {image_path} in {time.time() - start_time:.2f}s")
-        return True
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to convert {image_path}: {e}")
-        print(f"Error converting {image_path}: {e} in {time.time() - start_time:.2f}s")
-        return False
-
-# Function to convert a DOCX file to PDF using comtypes
-def docx_to_pdf(docx_path, output_pdf):
-    if not com_available:
-        messagebox.showerror("Error", "DOCX conversion requires Microsoft Word, which is not available.")
-        print(f"DOCX conversion disabled: Microsoft Word not available")
-        return False
-    start_time = time.time()
-    word = None
-    doc = None
-    try:
-        word = comtypes.client.CreateObject('Word.Application', dynamic=True)
-        word.Visible = False
-        word.DisplayAlerts = False
-        doc = word.Documents.Open(os.path.abspath(docx_path))
-        abs_output = os.path.abspath(output_pdf)
-        # Try multiple save methods to handle version differences
-        try:
-            doc.SaveAs2(abs_output, FileFormat=wdFormatPDF)
-            print("Used SaveAs2 with FileFormat")
-        except (AttributeError, TypeError):
-            try:
-                doc.SaveAs(abs_output, FileFormat=wdFormatPDF)
-                print("Used SaveAs with FileFormat")
-            except (AttributeError, TypeError):
-                try:
-                    doc.SaveAs(abs_output, wdFormatPDF)  # Positional argument
-                    print("Used SaveAs with positional FileFormat")
-                except (AttributeError, TypeError):
-                    try:
-                        doc.ExportAsFixedFormat(abs_output, OutputFormat=wdFormatPDF)
-                        print("Used ExportAsFixedFormat")
-                    except (AttributeError, TypeError):
-                        doc.SaveAs(abs_output)  # Try without format parameter
-                        print("Used SaveAs without format parameter")
-        print(f"Converted {docx_path} to {output_pdf} in {time.time() - start_time:.2f}s")
-        return True
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to convert {docx_path}: {e}")
-        print(f"Error converting {docx_path}: {e} in {time.time() - start_time:.2f}s")
-        return False
-    finally:
-        try:
-            if doc:
-                doc.Close()
-        except:
-            pass
-        try:
-            if word:
-                word.Quit()
-        except:
-            pass
-
-# Function to convert a TXT file to PDF
-def txt_to_pdf(txt_path, output_pdf):
-    start_time = time.time()
-    try:
-        c = canvas.Canvas(output_pdf, pagesize=letter)
-        c.setFont("Helvetica", 12)
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        y = 750
-        for line in lines:
-            if y < 50:
-                c.showPage()
-                y = 750
-            c.drawString(50, y, line.strip())
-            y -= 15
-        c.save()
-        print(f"Converted {txt_path} to {output_pdf} in {time.time() - start_time:.2f}s")
-        return True
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to convert {txt_path}: {e}")
-        print(f"Error converting {txt_path}: {e} in {time.time() - start_time:.2f}s")
-        return False
-
-# Function to extract specific pages from a PDF or DOCX
-def extract_pages(input_file, output_file, pages):
-    start_time = time.time()
-    temp_pdf = None
-    try:
-        if input_file.endswith('.docx'):
-            if not com_available:
-                messagebox.showerror("Error", "DOCX page extraction requires Microsoft Word, which is not available.")
-                print(f"DOCX page extraction disabled: Microsoft Word not available")
-                return None
-            temp_pdf = os.path.join("temp_split", f"temp_{os.path.basename(input_file)}.pdf")
-            if not docx_to_pdf(input_file, temp_pdf):
-                return None
-            input_file = temp_pdf
-
-        reader = PdfReader(input_file)
-        total_pages = len(reader.pages)
-        valid_pages = [p for p in pages if 0 <= p < total_pages]
-        if not valid_pages:
-            messagebox.showerror("Error", f"No valid pages selected for {input_file}. Using all pages.")
-            valid_pages = list(range(total_pages))  # Use all pages if invalid
-
-        writer = PdfWriter()
-        for page_num in valid_pages:
-            writer.add_page(reader.pages[page_num])
-        with open(output_file, 'wb') as f:
-            writer.write(f)
-        print(f"Extracted pages {valid_pages} from {input_file} to {output_file} in {time.time() - start_time:.2f}s")
-        return output_file, temp_pdf
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to extract pages from {input_file}: {e}")
-        print(f"Error extracting pages from {input_file}: {e} in {time.time() - start_time:.2f}s")
-        return None
-    finally:
-        if temp_pdf and os.path.exists(temp_pdf):
-            for _ in range(5):
-                try:
-                    os.remove(temp_pdf)
-                    print(f"Deleted temp file: {temp_pdf}")
-                    break
-                except PermissionError:
-                    time.sleep(0.1)
-                except Exception as e:
-                    print(f"Error deleting {temp_pdf}: {e}")
-
-# Function to merge files into a single PDF
-def merge_files(input_files, output_file, progress_callback=None, file_pages=None):
-    start_time = time.time()
-    merger = PdfMerger()
-    temp_files = []
-    output_dir = "temp_split"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    print(f"merge_files: input_files={[os.path.abspath(f) for f in input_files]}")
-    print(f"merge_files: file_pages={file_pages}")
-
-    total_files = len(input_files)
-    for i, file in enumerate(input_files):
-        if not os.path.exists(file):
-            messagebox.showerror("Error", f"File {file} does not exist")
-            continue
-        file = os.path.abspath(file)
-        pages = file_pages.get(file, []) if file_pages else []
-        print(f"Processing {file}: requested pages={pages}")
-        if progress_callback:
-            progress_callback(i / total_files * 100)
-
-        file_start_time = time.time()
-        if file.endswith(('.pdf', '.docx')) and pages:
-            temp_file, extra_temp = extract_pages(file, os.path.join(output_dir, f"temp_extract_{i}.pdf"), pages)
-            if temp_file:
-                temp_files.append(temp_file)
-                if extra_temp:
-                    temp_files.append(extra_temp)
-                try:
-                    merger.append(temp_file)
-                    print(f"Appended {temp_file} with selected pages in {time.time() - file_start_time:.2f}s")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to append {temp_file}: {e}")
-                    print(f"Error appending {temp_file}: {e}")
-            else:
-                continue
-        elif file.endswith('.pdf'):
-            try:
-                merger.append(file)
-                print(f"Appended {file} with all pages in {time.time() - file_start_time:.2f}s")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to append {file}: {e}")
-                print(f"Error appending {file}: {e}")
-        elif file.endswith('.docx'):
-            if not com_available:
-                messagebox.showerror("Error", f"Skipping {file}: DOCX conversion requires Microsoft Word")
-                print(f"Skipped {file}: DOCX conversion disabled")
-                continue
-            temp_pdf = os.path.join(output_dir, f"temp_docx_{i}.pdf")
-            if docx_to_pdf(file, temp_pdf):
-                temp_files.append(temp_pdf)
-                try:
-                    merger.append(temp_pdf)
-                    print(f"Appended {temp_pdf} with all pages in {time.time() - file_start_time:.2f}s")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to append {temp_pdf}: {e}")
-                    print(f"Error appending {temp_pdf}: {e}")
-        elif file.endswith(('.jpg', '.png')):
-            temp_pdf = os.path.join(output_dir, f"temp_image_{i}.pdf")
-            if image_to_pdf(file, temp_pdf):
-                temp_files.append(temp_pdf)
-                try:
-                    merger.append(temp_pdf)
-                    print(f"Appended {temp_pdf} in {time.time() - file_start_time:.2f}s")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to append {temp_pdf}: {e}")
-                    print(f"Error appending {temp_pdf}: {e}")
-        elif file.endswith('.txt'):
-            temp_pdf = os.path.join(output_dir, f"temp_txt_{i}.pdf")
-            if txt_to_pdf(file, temp_pdf):
-                temp_files.append(temp_pdf)
-                try:
-                    merger.append(temp_pdf)
-                    print(f"Appended {temp_pdf} in {time.time() - file_start_time:.2f}s")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to append {temp_pdf}: {e}")
-                    print(f"Error appending {temp_pdf}: {e}")
-        else:
-            messagebox.showerror("Error", f"Skipping {file}: Unsupported file type")
-            print(f"Skipped {file}: Unsupported file type")
+from filemerger import MergeCancelled, MergeError, format_page_ranges, merge_files, parse_page_ranges
+from filemerger.converters import close_docx_pool, docx_supported
+from filemerger.filelist import FileList, scan_folder
+from filemerger.index import PdfIndex
 
-        if progress_callback:
-            progress_callback((i + 1) / total_files * 100)
+# DOCX conversion needs Word through COM; Word itself is only started when the first DOCX is merged
+com_available = docx_supported()
 
-    if not merger.pages:
-        messagebox.showerror("Error", "No pages were merged. Check your input files.")
-        print("No pages merged")
-        return
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt', '.jpg', '.png')
+# Listbox rows inserted per event-loop turn, so a huge drop never freezes the window
+INSERT_BATCH = 2000
+# Page range rows the Set Pages dialog builds per event-loop turn
+DIALOG_ROW_BATCH = 50
+# Problems listed in the summary shown after a merge
+MAX_LISTED_ERRORS = 10
 
+
+def run_merge(entries, output_file, events, cancel_event, index=None):
+    # Runs on a worker thread: Tk is not thread-safe, so everything goes to the GUI through events
     try:
-        with open(output_file, 'wb') as f:
-            merger.write(f)
-        messagebox.showinfo("Success", f"Files merged into {output_file}")
-        print(f"Successfully merged into {output_file} in {time.time() - start_time:.2f}s")
-    except PermissionError:
-        messagebox.showerror("Error", f"Cannot write to {output_file}. Ensure it’s not open and you have permissions.")
-        print(f"Permission error writing to {output_file}")
+        result = merge_files(entries, output_file, index=index, cancel_event=cancel_event,
+                             on_progress=lambda progress: events.put(('progress', progress)))
+    except MergeCancelled:
+        events.put(('cancelled', None))
+    except MergeError as e:
+        print(f"Merge failed: {e}")
+        events.put(('failed', (str(e), e.errors)))
     except Exception as e:
-        messagebox.showerror("Error", f"Error merging files: {e}")
-        print(f"Error merging files: {e}")
-    finally:
-        merger.close()
+        print(f"Merge crashed: {e}")
+        events.put(('failed', (f"Unexpected error: {e}", [])))
+    else:
+        print(f"Successfully merged into {output_file} in {result.elapsed:.2f}s")
+        events.put(('done', result))
 
-    for temp_file in temp_files:
-        for _ in range(5):
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                    print(f"Deleted temp file: {temp_file}")
-                break
-            except PermissionError:
-                time.sleep(0.1)
-            except Exception as e:
-                messagebox.showerror("Error", f"Error deleting {temp_file}: {e}")
-                print(f"Error deleting {temp_file}: {e}")
+
+def list_errors(errors):
+    """Return the messages of errors as lines for a dialog, at most MAX_LISTED_ERRORS of them."""
+    listed = [message for _, message in errors[:MAX_LISTED_ERRORS]]
+    if len(errors) > MAX_LISTED_ERRORS:
+        listed.append(f"... and {len(errors) - MAX_LISTED_ERRORS} more")
+    return "\n".join(listed)
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes // 60}:{minutes % 60:02d}:{seconds:02d}" if minutes >= 60 else f"{minutes}:{seconds:02d}"
 
 # Dialog for setting page ranges per file
 class PageSelectionDialog(tk.Toplevel):
-    def __init__(self, parent, files):
+    def __init__(self, parent, files, file_pages, index):
         start_time = time.time()
         super().__init__(parent)
         self.title("Set Page Ranges")
-        self.geometry("500x400")
+        self.geometry("560x400")
         self.parent = parent
-        self.file_pages = {os.path.abspath(file): [] for file in files}
+        self.files = files
+        self.file_pages = list(file_pages)
+        self.index = index
         self.entries = {}
-        print("Opening Set Pages dialog with files:", [os.path.abspath(f) for f in files])
+        self.count_labels = {}  # row -> page count label of a PDF still being indexed
+        self._refresh_id = None  # the one pending _refresh_counts call
+        self._rows_id = None  # the pending _add_rows call, while rows are still being built
+        self._closed = False
+        self.errors = {}  # row -> why its page range is invalid
+        print(f"Opening Set Pages dialog with {len(files)} files")
         self.transient(parent)
         self.grab_set()
+        # Closing the window must cancel the pending calls too, which Tk's own close would not
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
 
         try:
             self.main_frame = ttk.Frame(self)
             self.main_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
             self.grid_rowconfigure(0, weight=1)
             self.grid_columnconfigure(0, weight=1)
+            ttk.Style(self).configure("Invalid.TEntry", foreground="red")
 
             ttk.Label(self.main_frame, text="Enter page ranges (e.g., 1,3-5). Leave blank for all pages.").grid(row=0, column=0, columnspan=2, pady=5, sticky="w")
 
             canvas = tk.Canvas(self.main_frame)
             scrollbar = ttk.Scrollbar(self.main_frame, orient="vertical", command=canvas.yview)
-            scrollable_frame = ttk.Frame(canvas)
+            self.scrollable_frame = ttk.Frame(canvas)
 
-            scrollable_frame.bind(
+            self.scrollable_frame.bind(
                 "<Configure>",
                 lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
             )
-            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+            canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
             canvas.configure(yscrollcommand=scrollbar.set)
 
             canvas.grid(row=1, column=0, sticky="nsew")
@@ -329,55 +101,110 @@ class PageSelectionDialog(tk.Toplevel):
             self.main_frame.grid_rowconfigure(1, weight=1)
             self.main_frame.grid_columnconfigure(0, weight=1)
 
-            for i, file in enumerate(files):
-                abs_file = os.path.abspath(file)
-                if abs_file.endswith('.pdf') or (abs_file.endswith('.docx') and com_available):
-                    frame = ttk.Frame(scrollable_frame)
-                    frame.grid(row=i, column=0, sticky="ew", padx=5, pady=2)
-                    label_text = os.path.basename(abs_file)
-                    ttk.Label(frame, text=label_text, width=40).grid(row=0, column=0, sticky="w")
-                    entry = ttk.Entry(frame)
-                    entry.grid(row=0, column=1, sticky="ew")
-                    frame.grid_columnconfigure(1, weight=1)
-                    self.entries[abs_file] = entry
-                    print(f"Added {label_text} to dialog")
+            self.status = ttk.Label(self.main_frame, text="", foreground="red")
+            self.status.grid(row=2, column=0, columnspan=2, sticky="w")
 
             button_frame = ttk.Frame(self.main_frame)
-            button_frame.grid(row=2, column=0, columnspan=2, pady=10)
+            button_frame.grid(row=3, column=0, columnspan=2, pady=10)
             ttk.Button(button_frame, text="OK", command=self.save_pages).grid(row=0, column=0, padx=5)
             ttk.Button(button_frame, text="Cancel", command=self.destroy).grid(row=0, column=1, padx=5)
+
+            self.rows = [i for i, file in enumerate(files)
+                         if file.lower().endswith('.pdf') or (file.lower().endswith('.docx') and com_available)]
+            self._add_rows(0)
             print(f"Dialog initialized in {time.time() - start_time:.2f}s")
         except Exception as e:
             print(f"Dialog initialization error: {e}")
             messagebox.showerror("Error", f"Failed to initialize dialog: {e}")
 
+    def _add_rows(self, start):
+        # The first rows show at once; the rest are built over the next event-loop turns
+        self._rows_id = None
+        if self._closed:
+            return
+        for i in self.rows[start:start + DIALOG_ROW_BATCH]:
+            file = self.files[i]
+            frame = ttk.Frame(self.scrollable_frame)
+            frame.grid(row=i, column=0, sticky="ew", padx=5, pady=2)
+            ttk.Label(frame, text=os.path.basename(file), width=40).grid(row=0, column=0, sticky="w")
+            count_label = ttk.Label(frame, text="", width=14)
+            count_label.grid(row=0, column=1, sticky="w")
+            entry = ttk.Entry(frame)
+            entry.insert(0, format_page_ranges(self.file_pages[i]))
+            entry.grid(row=0, column=2, sticky="ew")
+            entry.bind("<KeyRelease>", lambda e, i=i: self._validate(i))
+            frame.grid_columnconfigure(2, weight=1)
+            self.entries[i] = entry
+            if file.lower().endswith('.pdf'):
+                self.count_labels[i] = count_label
+                self._show_count(i)
+        if start + DIALOG_ROW_BATCH < len(self.rows):
+            self._rows_id = self.after(1, self._add_rows, start + DIALOG_ROW_BATCH)
+        if self.count_labels and self._refresh_id is None:
+            self._refresh_id = self.after(200, self._refresh_counts)
+
+    def _page_count(self, i):
+        info = self.index.get(self.files[i])
+        return info.pages if info is not None else None
+
+    def _show_count(self, i):
+        """Show row i's page count if the index has it; return whether it did."""
+        info = self.index.get(self.files[i])
+        if info is None:
+            return False
+        self.count_labels.pop(i).config(text=f"{info.pages} pages" + (", encrypted" if info.encrypted else ""))
+        self._validate(i)
+        return True
+
+    def _refresh_counts(self):
+        # Counts of PDFs the index has not read yet fill in as its threads finish them
+        self._refresh_id = None
+        if self._closed:
+            return
+        for i in list(self.count_labels):
+            self._show_count(i)
+        if self.count_labels:
+            if self.index.pending():
+                self._refresh_id = self.after(200, self._refresh_counts)
+            else:
+                for label in self.count_labels.values():
+                    label.config(text="unreadable")
+
+    def _validate(self, i):
+        error = None
+        try:
+            pages = parse_page_ranges(self.entries[i].get())
+        except ValueError:
+            error = "invalid page format"
+        else:
+            count = self._page_count(i)
+            if count is not None and pages and max(pages) >= count:
+                error = f"has only {count} pages"
+        if error:
+            self.errors[i] = f"{os.path.basename(self.files[i])}: {error}"
+        else:
+            self.errors.pop(i, None)
+        self.entries[i].config(style="Invalid.TEntry" if error else "TEntry")
+        self.status.config(text=next(iter(self.errors.values()), ""))
+
+    def destroy(self):
+        self._closed = True
+        for pending in (self._refresh_id, self._rows_id):
+            if pending is not None:
+                self.after_cancel(pending)
+        self._refresh_id = self._rows_id = None
+        super().destroy()
+
     def save_pages(self):
         print("save_pages called")
-        for file, entry in self.entries.items():
-            print(f"Entry for {file}: {entry.get()}")
-            pages = []
-            try:
-                if entry.get().strip():
-                    for part in entry.get().split(','):
-                        part = part.strip()
-                        if '-' in part:
-                            start, end = map(int, part.split('-'))
-                            if start < 1 or end < start:
-                                raise ValueError(f"Invalid page range for {os.path.basename(file)}")
-                            pages.extend(range(start-1, end))
-                        else:
-                            page = int(part)
-                            if page < 1:
-                                raise ValueError(f"Invalid page number for {os.path.basename(file)}")
-                            pages.append(page-1)
-                self.file_pages[file] = pages
-                print(f"Set pages for {file}: {pages}")
-            except Exception as e:
-                print(f"Error processing {file}: {e}")
-                messagebox.showerror("Error", f"Invalid page format for {os.path.basename(file)}: {e}")
-                return
-        self.parent.file_pages = dict(self.file_pages)
-        print(f"save_pages: file_pages={self.parent.file_pages}")
+        for i in self.entries:
+            self._validate(i)
+        if self.errors:
+            messagebox.showerror("Error", "Invalid page ranges:\n" + "\n".join(list(self.errors.values())[:10]))
+            return
+        for i, entry in self.entries.items():
+            self.parent.files.set_pages(i, parse_page_ranges(entry.get()))
+        print(f"save_pages: updated {len(self.entries)} page selections")
         self.destroy()
 
 # GUI App with drag-and-drop and file selection
@@ -387,118 +214,183 @@ class FileMergerApp(TkinterDnD.Tk):
         super().__init__()
         self.title("FileMerger - Offline File Combiner")
         self.geometry("600x400")
-        self.files = []
-        self.file_pages = {}
+        self.files = FileList()  # paths and the page selection for each
+        self.index = PdfIndex()  # page counts of the PDFs, read in the background as they are added
+        self._pending_rows = []  # names waiting to be inserted into the Listbox
+        self._scan_results = queue.Queue()  # batches of paths from every running Add Folder scan
+        self._active_scans = 0  # scans that have not put their end marker on _scan_results yet
+        self._merge_events = queue.Queue()
+        self._cancel_merge = None  # threading.Event of the running merge
         style = ttk.Style()
         style.configure("TButton", padding=5)
         label_text = "Drag files here or click 'Add Files' to merge PDFs, DOCX, TXT, JPG, PNG"
         if not com_available:
-            label_text += " (DOCX conversion disabled due to COM initialization failure)"
+            label_text += " (DOCX conversion disabled: Microsoft Word COM is not available)"
         ttk.Label(self, text=label_text).pack(pady=10)
-        self.file_list = tk.Listbox(self, width=80, height=10)
+        self.file_list = tk.Listbox(self, width=80, height=10, selectmode=tk.EXTENDED)
         self.file_list.pack(pady=10)
         self.file_list.drop_target_register(DND_FILES)
         self.file_list.dnd_bind('<<Drop>>', self.drop_files)
         button_frame = tk.Frame(self)
         button_frame.pack(pady=10)
         ttk.Button(button_frame, text="Add Files", command=self.add_files).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Add Folder", command=self.add_folder).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Remove Selected", command=self.remove_file).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Move Up", command=self.move_up).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Move Down", command=self.move_down).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Duplicate", command=self.duplicate_file).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Set Pages", command=self.set_pages).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Merge Files", command=self.merge).pack(side=tk.LEFT, padx=5)
+        self.merge_button = ttk.Button(button_frame, text="Merge Files", command=self.merge)
+        self.merge_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_merge, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Help", command=self.show_help).pack(side=tk.LEFT, padx=5)
         self.progress = ttk.Progressbar(self, length=400, mode='determinate')
         self.progress.pack(pady=10)
+        self.status = ttk.Label(self, text="")
+        self.status.pack()
         print(f"GUI initialized in {time.time() - start_time:.2f}s")
 
     def drop_files(self, event):
         start_time = time.time()
-        files = self.split_files(event.data)
-        for file in files:
-            abs_file = os.path.abspath(file)
-            if abs_file not in self.files and abs_file.endswith(('.pdf', '.docx', '.txt', '.jpg', '.png')):
-                if abs_file.endswith('.docx') and not com_available:
-                    messagebox.showwarning("Warning", f"Skipping {os.path.basename(abs_file)}: DOCX conversion disabled")
-                    continue
-                self.files.append(abs_file)
-                self.file_list.insert(tk.END, os.path.basename(abs_file))
-        print(f"Files after drop: {self.files} in {time.time() - start_time:.2f}s")
-
-    def split_files(self, data):
-        files = []
-        if '{' in data:
-            current = ""
-            in_braces = False
-            for char in data:
-                if char == '{':
-                    in_braces = True
-                elif char == '}':
-                    in_braces = False
-                elif char == ' ' and not in_braces:
-                    files.append(current)
-                    current = ""
-                else:
-                    current += char
-            if current:
-                files.append(current)
-        else:
-            files = data.split()
-        return [f.strip() for f in files if os.path.exists(f.strip())]
+        # Tk hands over a Tcl list; brace-quoted paths with spaces are split correctly
+        added = self.add_paths(self.tk.splitlist(event.data))
+        print(f"Dropped {added} files ({len(self.files)} total) in {time.time() - start_time:.2f}s")
+
+    def add_paths(self, paths):
+        """Add supported files that are not listed yet; return how many were added."""
+        accepted = []
+        skipped_docx = 0
+        for path in paths:
+            lower = path.lower()
+            if not lower.endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if lower.endswith('.docx') and not com_available:
+                skipped_docx += 1
+                continue
+            accepted.append(path)
+        added = self.files.add(accepted)
+        if added:
+            self.index.request(added)
+            self._queue_rows(os.path.basename(path) for path in added)
+        if skipped_docx:
+            messagebox.showwarning("Warning", f"Skipped {skipped_docx} DOCX file(s): DOCX conversion disabled")
+        return len(added)
+
+    def _queue_rows(self, names):
+        # Rows go in a few thousand per event-loop turn with one insert call each
+        start = not self._pending_rows
+        self._pending_rows.extend(names)
+        if start:
+            self.after_idle(self._insert_rows)
+
+    def _insert_rows(self):
+        batch = self._pending_rows[:INSERT_BATCH]
+        del self._pending_rows[:INSERT_BATCH]
+        self.file_list.insert(tk.END, *batch)
+        if self._pending_rows:
+            self.after(1, self._insert_rows)
+
+    def _refresh_list(self):
+        self._pending_rows.clear()
+        self.file_list.delete(0, tk.END)
+        self._queue_rows(os.path.basename(path) for path in self.files.paths)
 
     def add_files(self):
         start_time = time.time()
         files = filedialog.askopenfilenames(filetypes=[("Supported Files", "*.pdf *.docx *.txt *.jpg *.png"), ("All Files", "*.*")])
-        for file in files:
-            abs_file = os.path.abspath(file)
-            if abs_file not in self.files:
-                if abs_file.endswith('.docx') and not com_available:
-                    messagebox.showwarning("Warning", f"Skipping {os.path.basename(abs_file)}: DOCX conversion disabled")
+        added = self.add_paths(files)
+        print(f"Added {added} files ({len(self.files)} total) in {time.time() - start_time:.2f}s")
+
+    def add_folder(self):
+        directory = filedialog.askdirectory()
+        if not directory:
+            return
+        self.status.config(text=f"Scanning {directory}...")
+        self._active_scans += 1
+        threading.Thread(target=self._scan_folder, args=(directory,), daemon=True).start()
+        if self._active_scans == 1:
+            # Scans started while this one runs share its drain loop
+            self.after(100, self._drain_scan_results)
+
+    def _scan_folder(self, directory):
+        # Runs on a worker thread; results reach the GUI thread through the queue
+        batch = []
+        try:
+            for path in scan_folder(directory, SUPPORTED_EXTENSIONS):
+                batch.append(path)
+                if len(batch) >= INSERT_BATCH:
+                    self._scan_results.put(batch)
+                    batch = []
+        finally:
+            self._scan_results.put(batch)
+            self._scan_results.put(None)
+
+    def _drain_scan_results(self):
+        while True:
+            try:
+                batch = self._scan_results.get_nowait()
+            except queue.Empty:
+                self.after(100, self._drain_scan_results)
+                return
+            if batch is None:
+                self._active_scans -= 1
+                if self._active_scans:
                     continue
-                self.files.append(abs_file)
-                self.file_list.insert(tk.END, os.path.basename(abs_file))
-        print(f"Files after add: {self.files} in {time.time() - start_time:.2f}s")
+                self.status.config(text=f"{len(self.files)} files")
+                print(f"Folder scan finished, {len(self.files)} files")
+                return
+            self.add_paths(batch)
+            self.status.config(text=f"Scanning... {len(self.files)} files")
 
     def remove_file(self):
         start_time = time.time()
         selected = self.file_list.curselection()
         if selected:
-            index = selected[0]
-            self.file_list.delete(index)
-            file = self.files.pop(index)
-            self.file_pages.pop(file, None)
-            print(f"Removed file: {file}, updated file_pages: {self.file_pages} in {time.time() - start_time:.2f}s")
+            self.files.remove(selected)
+            if len(selected) > 100 or self._pending_rows:
+                self._refresh_list()
+            else:
+                for index in reversed(selected):
+                    self.file_list.delete(index)
+            print(f"Removed {len(selected)} files ({len(self.files)} left) in {time.time() - start_time:.2f}s")
 
-    def move_up(self):
-        start_time = time.time()
+    def _move_selected(self, offset):
         selected = self.file_list.curselection()
-        if selected and selected[0] > 0:
-            index = selected[0]
-            self.files.insert(index - 1, self.files.pop(index))
-            self.file_list.delete(index)
-            self.file_list.insert(index - 1, os.path.basename(self.files[index - 1]))
-            self.file_list.select_set(index - 1)
-            print(f"Files after move up: {self.files} in {time.time() - start_time:.2f}s")
+        if not selected or self._pending_rows:
+            return
+        index = selected[0]
+        target = self.files.move(index, offset)
+        if target is None:
+            return
+        self.file_list.delete(index)
+        self.file_list.insert(target, os.path.basename(self.files.paths[target]))
+        self.file_list.selection_clear(0, tk.END)
+        self.file_list.select_set(target)
+        self.file_list.see(target)
+
+    def move_up(self):
+        self._move_selected(-1)
 
     def move_down(self):
-        start_time = time.time()
+        self._move_selected(1)
+
+    def duplicate_file(self):
+        # Add the selected file again below itself, e.g. to take another page range from it
         selected = self.file_list.curselection()
-        if selected and selected[0] < len(self.files) - 1:
-            index = selected[0]
-            self.files.insert(index + 1, self.files.pop(index))
-            self.file_list.delete(index)
-            self.file_list.insert(index + 1, os.path.basename(self.files[index]))
-            self.file_list.select_set(index + 1)
-        print(f"Files after move down: {self.files} in {time.time() - start_time:.2f}s")
+        if selected and not self._pending_rows:
+            index = self.files.duplicate(selected[0])
+            self.file_list.insert(index, os.path.basename(self.files.paths[index]))
+            self.file_list.selection_clear(0, tk.END)
+            self.file_list.select_set(index)
+            print(f"Duplicated {self.files.paths[index]}")
 
     def set_pages(self):
         start_time = time.time()
         if not self.files:
             messagebox.showwarning("Warning", "No files selected")
             return
-        print("Calling set_pages, files:", self.files)
-        print("file_pages before dialog:", self.file_pages)
-        PageSelectionDialog(self, self.files)
+        PageSelectionDialog(self, self.files.paths, self.files.pages, self.index)
         print(f"Set pages dialog opened in {time.time() - start_time:.2f}s")
 
     def merge(self):
@@ -508,20 +400,78 @@ class FileMergerApp(TkinterDnD.Tk):
             return
         output_file = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF Files", "*.pdf")])
         if output_file:
-            print(f"merge: file_pages={self.file_pages}")
+            print(f"merge: {len(self.files)} entries")
             self.progress['value'] = 0
-            threading.Thread(target=merge_files, args=(self.files, output_file, self.update_progress, self.file_pages), daemon=True).start()
+            self.status.config(text="Merging...")
+            self.merge_button.config(state=tk.DISABLED)
+            self.cancel_button.config(state=tk.NORMAL)
+            self._cancel_merge = threading.Event()
+            entries = self.files.entries()
+            threading.Thread(target=run_merge, args=(entries, output_file, self._merge_events, self._cancel_merge,
+                                                     self.index), daemon=True).start()
+            self.after(100, self._drain_merge_events)
         print(f"Merge initiated in {time.time() - start_time:.2f}s")
 
-    def update_progress(self, value):
-        if int(value) % 10 == 0:  # Update every 10% to reduce GUI lag
-            self.progress['value'] = value
-            self.update_idletasks()
+    def cancel_merge(self):
+        if self._cancel_merge is not None:
+            self._cancel_merge.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.status.config(text="Cancelling...")
+
+    def _drain_merge_events(self):
+        # Only the latest progress matters; the worker may have queued many since the last tick
+        progress = None
+        while True:
+            try:
+                kind, payload = self._merge_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                progress = payload
+                continue
+            self._merge_finished(kind, payload)
+            return
+        if progress is not None and not self._cancel_merge.is_set():
+            self.progress['value'] = progress.fraction * 100
+            self.status.config(text=self._progress_text(progress))
+        self.after(100, self._drain_merge_events)
+
+    def _progress_text(self, progress):
+        stage = "Writing" if progress.stage == 'write' else f"File {min(progress.files_done + 1, progress.files_total)} of {progress.files_total}"
+        text = f"{stage}: {progress.pages_done} pages, {progress.bytes_per_second / 1e6:.1f} MB/s"
+        if progress.eta is not None:
+            text += f", {format_duration(progress.eta)} left"
+        return text
+
+    def _merge_finished(self, kind, payload):
+        self._cancel_merge = None
+        self.merge_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        if kind == 'cancelled':
+            self.progress['value'] = 0
+            self.status.config(text="Merge cancelled")
+        elif kind == 'failed':
+            message, errors = payload
+            self.status.config(text="Merge failed")
+            if errors:
+                message += f"\n\n{len(errors)} input(s) had problems:\n\n" + list_errors(errors)
+            messagebox.showerror("Error", message)
+        else:
+            result = payload
+            self.progress['value'] = 100
+            self.status.config(text=f"Merged {result.page_count} pages in {format_duration(result.elapsed)}")
+            if result.errors:
+                # One summary instead of a dialog per failed input
+                messagebox.showwarning("Merged with problems", f"Files merged into {result.output_file}, "
+                                       f"but {len(result.errors)} input(s) had problems:\n\n"
+                                       + list_errors(result.errors))
+            else:
+                messagebox.showinfo("Success", f"Files merged into {result.output_file}")
 
     def show_help(self):
-        help_text = "1. Drag files or click 'Add Files' to add PDFs, DOCX, TXT, JPG, PNG.\n2. Reorder with 'Move Up'/'Move Down'.\n3. Click 'Set Pages' to select pages for each PDF/DOCX.\n4. Click 'Merge Files' to create a PDF."
+        help_text = "1. Drag files, click 'Add Files', or 'Add Folder' to add every PDF, DOCX, TXT, JPG and PNG in a folder tree.\n2. Reorder with 'Move Up'/'Move Down'; 'Duplicate' adds a file again for another page range.\n3. Click 'Set Pages' to select pages for each PDF/DOCX.\n4. Click 'Merge Files' to create a PDF; 'Cancel' stops a running merge."
         if not com_available:
-            help_text += "\nNote: DOCX conversion is disabled due to Microsoft Word COM initialization failure. Ensure Word is installed and run as administrator."
+            help_text += "\nNote: DOCX conversion is disabled because Microsoft Word COM is not available. Ensure Word is installed and run as administrator."
         else:
             help_text += "\nNote: DOCX conversion requires Microsoft Word."
         messagebox.showinfo("Help", help_text)
@@ -529,10 +479,8 @@ class FileMergerApp(TkinterDnD.Tk):
 if __name__ == "__main__":
     app = FileMergerApp()
     app.mainloop()
+    app.index.close()
     
-    # Clean up COM resources
-    try:
-        comtypes.CoUninitialize()
-    except:
-        pass
+    # Shut down the DOCX conversion workers (and their Word instances)
+    close_docx_pool()
     
\ No newline at end of file
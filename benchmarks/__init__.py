@@ -0,0 +1 @@
+"""Benchmarks for the filemerger engine; see benchmarks.run."""
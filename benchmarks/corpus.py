@@ -0,0 +1,130 @@
+"""Deterministic synthetic input corpora for the benchmarks.
+
+The same profile and seed always produce byte-identical files, so timings
+taken on different machines or versions compare like with like.  A corpus
+directory holds the inputs plus corpus.json, which lists them by kind.
+"""
+import json
+import os
+import random
+import zlib
+
+from filemerger.pdfraw import RawPdfWriter, pdf_string
+
+MANIFEST = "corpus.json"
+
+# name -> inputs to generate; sizes are kept small enough for CI by default
+PROFILES = {
+    'small': {
+        'pdf_pages': (1, 10, 100, 500),
+        'images': (('photo', 'jpeg', (1280, 960), 'RGB'), ('scan', 'jpeg', (2480, 3508), 'L'),
+                   ('diagram', 'png', (1024, 768), 'RGB'), ('gray', 'png', (1700, 2200), 'L'),
+                   ('overlay', 'png', (800, 600), 'RGBA')),
+        'text_bytes': (2 * 1024, 256 * 1024, 4 * 1024 * 1024),
+        'raw_pdf_pages': 200,
+    },
+    'large': {
+        'pdf_pages': (1, 100, 1000, 5000),
+        'images': (('photo', 'jpeg', (4032, 3024), 'RGB'), ('scan', 'jpeg', (4960, 7016), 'L'),
+                   ('diagram', 'png', (2048, 1536), 'RGB'), ('gray', 'png', (3400, 4400), 'L'),
+                   ('overlay', 'png', (1600, 1200), 'RGBA')),
+        'text_bytes': (2 * 1024, 4 * 1024 * 1024, 64 * 1024 * 1024),
+        'raw_pdf_pages': 2000,
+    },
+}
+
+_WORDS = ("request", "handled", "worker", "status", "invoice", "total", "account", "page", "merge",
+          "document", "error", "retry", "queue", "customer", "order", "shipped", "pending", "report")
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def write_pdf(path, pages, rng, compress=True):
+    """Write a text-only PDF of the given page count; compress=False stores its content streams raw."""
+    with open(path, 'wb') as f:
+        pdf = RawPdfWriter(f)
+        catalog, tree, resources = pdf.reserve(), pdf.reserve(), pdf.reserve()
+        pdf.write_object(resources, b"<< /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Times-Roman >> >> >>")
+        kids = []
+        for number in range(1, pages + 1):
+            page, content = pdf.reserve(), pdf.reserve()
+            lines = [b"BT /F1 11 Tf 14 TL 72 720 Td %s Tj" % pdf_string(f"Page {number} of {pages}")]
+            lines.extend(b"T* %s Tj" % pdf_string(_sentence(rng, 12)) for _ in range(40))
+            lines.append(b"ET")
+            if compress:
+                pdf.write_stream(content, b"/Filter /FlateDecode", zlib.compress(b"\n".join(lines)))
+            else:
+                pdf.write_stream(content, b"", b"\n".join(lines))
+            pdf.write_object(page, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Resources %d 0 R "
+                                   b"/Contents %d 0 R >>" % (tree, resources, content))
+            kids.append(page)
+        pdf.write_object(tree, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)))
+        pdf.write_object(catalog, b"<< /Type /Catalog /Pages %d 0 R >>" % tree)
+        pdf.close(catalog)
+
+
+def write_image(path, image_format, size, mode, rng):
+    """Write a gradient with a little noise, so it compresses like a photo or scan."""
+    from PIL import Image
+
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.frombytes('L', (256, 256), rng.randbytes(256 * 256)).resize(size)
+    base = Image.blend(gradient, noise, 0.15)
+    if mode == 'L':
+        image = base
+    else:
+        bands = [base, base.rotate(90, expand=False), Image.radial_gradient('L').resize(size)]
+        if mode == 'RGBA':
+            bands.append(gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT))
+        image = Image.merge(mode, bands)
+    if image_format == 'jpeg':
+        image.save(path, 'JPEG', quality=90)
+    else:
+        image.save(path, 'PNG')
+
+
+def write_text(path, size, rng):
+    """Write a log-like UTF-8 text file of about size bytes."""
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        while written < size:
+            line = f"2026-01-01 00:00:{written % 60:02d} INFO {_sentence(rng, rng.randint(4, 30))}\n"
+            f.write(line)
+            written += len(line)
+
+
+def generate_corpus(directory, profile='small', seed=0):
+    """Generate the inputs of a profile in directory and return the manifest."""
+    spec = PROFILES[profile]
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    manifest = {'profile': profile, 'seed': seed, 'pdf': [], 'pages': {}, 'image': [], 'text': [], 'raw_pdf': []}
+    for pages in spec['pdf_pages']:
+        name = f"doc_{pages}p.pdf"
+        write_pdf(os.path.join(directory, name), pages, rng)
+        manifest['pdf'].append(name)
+        manifest['pages'][name] = pages
+    for label, image_format, size, mode in spec['images']:
+        name = f"{label}_{size[0]}x{size[1]}.{'jpg' if image_format == 'jpeg' else 'png'}"
+        write_image(os.path.join(directory, name), image_format, size, mode, rng)
+        manifest['image'].append(name)
+    for size in spec['text_bytes']:
+        name = f"log_{size // 1024}k.txt"
+        write_text(os.path.join(directory, name), size, rng)
+        manifest['text'].append(name)
+    # Generated last so the inputs above stay identical to older corpora of the same seed
+    name = f"raw_{spec['raw_pdf_pages']}p.pdf"
+    write_pdf(os.path.join(directory, name), spec['raw_pdf_pages'], rng, compress=False)
+    manifest['raw_pdf'].append(name)
+    manifest['pages'][name] = spec['raw_pdf_pages']
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_corpus(directory):
+    with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,263 @@
+"""Benchmark runner: ``python -m benchmarks.run``.
+
+    python -m benchmarks.run generate corpus/ --profile small
+    python -m benchmarks.run run corpus/ -o results.json --repeat 3
+    python -m benchmarks.run compare baseline.json results.json --threshold 10
+
+Every repetition of a case runs in a fresh interpreter so that its peak RSS
+is its own and no warm import or reader cache leaks between cases.  The
+child times only the operation itself; interpreter start-up and imports are
+excluded.  Only the filemerger package is driven, never the Tk GUI, so no
+display is needed and no message box can block a run.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .corpus import PROFILES, generate_corpus, load_corpus
+
+RESULTS_FORMAT = 1
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Output option cases and the case each is compared with
+OUTPUT_VARIANTS = {
+    'output/compress': 'output/plain',
+    'output/object-streams': 'output/plain',
+    'output/compress+object-streams': 'output/plain',
+    'output/linearized': 'output/plain',
+}
+
+
+def _merge(inputs, **options):
+    from filemerger import merge_files
+
+    def run(output):
+        merge_files(inputs, output, **options)
+    return run
+
+
+def _convert(path):
+    def run(output):
+        from filemerger.registry import get_converter
+
+        get_converter(path)(path, output)
+    return run
+
+
+def _extract(path, pages):
+    def run(output):
+        from filemerger import extract_pages
+
+        extract_pages(path, output, pages)
+    return run
+
+
+def _can_linearize():
+    from filemerger.errors import MergeError
+    from filemerger.linearize import find_linearizer
+
+    try:
+        find_linearizer()
+    except MergeError:
+        return False
+    return True
+
+
+def build_cases(corpus_dir):
+    """Return {case name: callable(output_path)} for a generated corpus."""
+    corpus = load_corpus(corpus_dir)
+    paths = {kind: [os.path.join(corpus_dir, name) for name in corpus.get(kind, [])]
+             for kind in ('pdf', 'image', 'text', 'raw_pdf')}
+    everything = paths['pdf'] + paths['image'] + paths['text']
+    largest = paths['pdf'][-1]
+    page_count = corpus['pages'][corpus['pdf'][-1]]
+    # Twenty evenly spaced five-page slices of the largest PDF
+    step = max(page_count // 20, 1)
+    slices = [(largest, list(range(first, min(first + 5, page_count)))) for first in range(0, page_count, step)][:20]
+
+    cases = {
+        'merge/pdf': _merge(paths['pdf']),
+        'merge/mixed': _merge(everything),
+        'merge/mixed-streaming': _merge(everything, streaming=True),
+        'merge/mixed-dedup': _merge(everything, dedup=True),
+        'merge/page-ranges': _merge(slices),
+        'extract/odd-pages': _extract(largest, list(range(0, page_count, 2))),
+    }
+    # Output options, on every input plus a PDF whose content streams are stored uncompressed
+    output_inputs = everything + paths['raw_pdf']
+    cases['output/plain'] = _merge(output_inputs, streaming=True)
+    cases['output/compress'] = _merge(output_inputs, compress=True)
+    cases['output/object-streams'] = _merge(output_inputs, object_streams=True)
+    cases['output/compress+object-streams'] = _merge(output_inputs, compress=True, object_streams=True)
+    if _can_linearize():
+        cases['output/linearized'] = _merge(output_inputs, compress=True, object_streams=True, linearize=True)
+    for kind in ('image', 'text'):
+        for path in paths[kind]:
+            cases[f"convert/{os.path.basename(path)}"] = _convert(path)
+    return cases
+
+
+def _peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_child(corpus_dir, name):
+    """Run one case in this process and print its measurements as JSON."""
+    case = build_cases(corpus_dir)[name]
+    with tempfile.TemporaryDirectory(prefix='filemerger_bench_') as scratch:
+        output = os.path.join(scratch, 'out.pdf')
+        start = time.perf_counter()
+        case(output)
+        wall = time.perf_counter() - start
+        size = os.path.getsize(output)
+    print(json.dumps({'wall_s': wall, 'peak_rss_kb': _peak_rss_kb(), 'output_bytes': size}))
+
+
+def run_case(corpus_dir, name, repeat):
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-m', 'benchmarks.run', '_child', corpus_dir, name],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=_ROOT)
+        if completed.returncode != 0:
+            return {'error': completed.stderr.strip().splitlines()[-1:] or ['exit %d' % completed.returncode]}
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    walls = [run['wall_s'] for run in runs]
+    return {
+        'wall_s': statistics.median(walls),
+        'wall_s_min': min(walls),
+        'wall_s_runs': walls,
+        'peak_rss_kb': max(run['peak_rss_kb'] for run in runs),
+        'output_bytes': runs[-1]['output_bytes'],
+    }
+
+
+def _version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True, check=True, cwd=_ROOT).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(corpus_dir, repeat=3, pattern='*'):
+    corpus_dir = os.path.abspath(corpus_dir)
+    results = {
+        'format': RESULTS_FORMAT,
+        'version': _version(),
+        'corpus': load_corpus(corpus_dir),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'cases': {},
+    }
+    for name in build_cases(corpus_dir):
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        result = results['cases'][name] = run_case(corpus_dir, name, repeat)
+        if 'error' in result:
+            print(f"{name:<40} FAILED: {result['error'][0]}", file=sys.stderr)
+        else:
+            print(f"{name:<40} {result['wall_s']:8.3f}s {result['peak_rss_kb'] / 1024:8.1f} MB "
+                  f"{result['output_bytes'] / 1024:10.1f} KiB", file=sys.stderr)
+    print_output_variants(results['cases'])
+    return results
+
+
+def print_output_variants(cases):
+    """Print the size and time of each output option case against its baseline case."""
+    rows = [(name, base) for name, base in OUTPUT_VARIANTS.items()
+            if 'wall_s' in cases.get(name, {}) and 'wall_s' in cases.get(base, {})]
+    if not rows:
+        return
+    print(f"\n{'output option':<40} {'size':>10} {'time':>10}", file=sys.stderr)
+    for name, base in rows:
+        new, old = cases[name], cases[base]
+        size = (new['output_bytes'] - old['output_bytes']) / old['output_bytes'] * 100
+        wall = (new['wall_s'] - old['wall_s']) / old['wall_s'] * 100
+        print(f"{name:<40} {size:+9.1f}% {wall:+9.1f}%  vs {base}", file=sys.stderr)
+
+
+def compare(baseline, current, threshold):
+    """Print per-case changes; return the names of cases slower or larger beyond threshold percent."""
+    regressions = []
+    print(f"{'case':<40} {'wall':>18} {'peak RSS':>18} {'output':>18}")
+    for name, new in current['cases'].items():
+        old = baseline['cases'].get(name)
+        if old is None or 'error' in old or 'error' in new:
+            print(f"{name:<40} {'(not comparable)':>18}")
+            continue
+        cells = []
+        regressed = False
+        for metric in ('wall_s', 'peak_rss_kb', 'output_bytes'):
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            regressed = regressed or change > threshold
+            cells.append(f"{change:+17.1f}%")
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<40} {' '.join(cells)}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="filemerger benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a synthetic corpus")
+    generate.add_argument("directory")
+    generate.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    generate.add_argument("--seed", type=int, default=0)
+
+    run = commands.add_parser("run", help="run the benchmark cases against a corpus")
+    run.add_argument("corpus")
+    run.add_argument("-o", "--output", help="write results JSON here (default: stdout)")
+    run.add_argument("--repeat", type=int, default=3, help="runs per case; the median is reported")
+    run.add_argument("-k", "--cases", default="*", metavar="PATTERN", help="only run cases matching this glob")
+
+    diff = commands.add_parser("compare", help="compare two results files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=10.0, metavar="PERCENT",
+                      help="exit non-zero if any metric grows by more than this (default: 10)")
+
+    child = commands.add_parser("_child")
+    child.add_argument("corpus")
+    child.add_argument("case")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "generate":
+        generate_corpus(args.directory, args.profile, args.seed)
+    elif args.command == "run":
+        results = run_suite(args.corpus, args.repeat, args.cases)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 1 if any('error' in case for case in results['cases'].values()) else 0
+    elif args.command == "compare":
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+        return 1 if compare(baseline, current, args.threshold) else 0
+    elif args.command == "_child":
+        run_child(args.corpus, args.case)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""Headless FileMerger engine.
+
+Importing the package is cheap: PDF, image and Word libraries are loaded the
+first time a merge or conversion needs them.
+"""
+from .cache import ConversionCache
+from .engine import MergeProgress, MergeResult, extract_pages, format_page_ranges, merge_files, parse_page_ranges
+from .errors import ConversionError, MergeCancelled, MergeError, PreflightError
+from .index import PdfIndex
+
+__all__ = [
+    "ConversionCache",
+    "ConversionError",
+    "MergeCancelled",
+    "MergeError",
+    "MergeProgress",
+    "MergeResult",
+    "PdfIndex",
+    "PreflightError",
+    "extract_pages",
+    "format_page_ranges",
+    "merge_files",
+    "parse_page_ranges",
+]
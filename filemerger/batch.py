@@ -0,0 +1,255 @@
+"""Run many merges from one manifest: ``python -m filemerger batch jobs.json``.
+
+A manifest lists jobs, each with an output and its ordered inputs in the
+format of watch manifests, plus options applied to every job:
+
+    {"options": {"image_dpi": 150, "compress": true},
+     "jobs": [{"output": "out/a.pdf", "inputs": ["cover.pdf", ["report.pdf", "1-3"]]},
+              {"output": "out/b.pdf", "inputs": ["cover.pdf", "notes.txt"], "options": {"strict": true}}]}
+
+Paths are relative to the manifest.  Manifests ending in .yaml or .yml are
+read with PyYAML when it is installed.
+
+Every source is converted once, however many jobs use it, and every PDF is
+parsed once into a reader the jobs share (see SharedReaders).  One budget
+of workers covers both: conversions run on a process pool and jobs merge on
+threads, and each running conversion or merge holds a slot.  Sources are
+converted in the order the jobs first need them, and a job starts as soon
+as its own sources are ready.  Jobs always use the streaming writer, which
+is what lets them copy pages from shared readers.
+"""
+import concurrent.futures
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from . import tracing
+from .engine import SharedReaders, _needs_conversion, _run_converter, converter_options, merge_files
+from .errors import ConversionError, MergeError
+from .registry import get_converter
+from .watch import manifest_inputs
+
+logger = logging.getLogger(__name__)
+
+# Options that change how sources are converted, so they apply to the whole batch
+CONVERSION_OPTIONS = ('image_dpi', 'text_encoding', 'wrap_text')
+JOB_OPTIONS = ('strict', 'dedup', 'compress', 'object_streams', 'linearize', 'preflight')
+
+
+class BatchJob:
+    """One output of a batch, and once run, how it went."""
+
+    def __init__(self, output, inputs, options=None):
+        self.output = output
+        self.inputs = inputs
+        self.options = options or {}
+        self.status = 'pending'
+        self.page_count = 0
+        self.elapsed = 0.0
+        self.errors = []  # (input file or None, message) pairs
+
+    def report(self):
+        return {'output': self.output, 'status': self.status, 'pages': self.page_count,
+                'elapsed': self.elapsed, 'inputs': len(self.inputs),
+                'errors': [{'file': file, 'message': message} for file, message in self.errors]}
+
+
+def _check_options(options, allowed, where):
+    if not isinstance(options, dict):
+        raise MergeError(f"{where}: options must be a mapping")
+    unknown = sorted(set(options) - set(allowed))
+    if unknown:
+        raise MergeError(f"{where}: unknown option(s) {', '.join(unknown)}")
+
+
+def load_manifest(path):
+    """Return (jobs, conversion options) from a JSON or YAML batch manifest."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            if path.lower().endswith(('.yaml', '.yml')):
+                try:
+                    import yaml
+                except ImportError as e:
+                    raise MergeError("YAML manifests need the PyYAML package") from e
+                try:
+                    data = yaml.safe_load(f)
+                except yaml.YAMLError as e:
+                    raise MergeError(f"Cannot read {path}: {e}") from e
+            else:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise MergeError(f"Cannot read {path}: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get('jobs'), list):
+        raise MergeError(f"{path}: expected a mapping with a list of jobs")
+    defaults = data.get('options') or {}
+    _check_options(defaults, CONVERSION_OPTIONS + JOB_OPTIONS, path)
+    job_defaults = {name: value for name, value in defaults.items() if name in JOB_OPTIONS}
+
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    outputs = set()
+    for number, spec in enumerate(data['jobs'], 1):
+        where = f"{path}: job {number}"
+        if not isinstance(spec, dict) or not isinstance(spec.get('output'), str):
+            raise MergeError(f"{where}: needs an output path")
+        options = spec.get('options') or {}
+        _check_options(options, JOB_OPTIONS, where)
+        output = os.path.join(base, spec['output'])
+        if output in outputs:
+            raise MergeError(f"{where}: {spec['output']} is also the output of an earlier job")
+        outputs.add(output)
+        jobs.append(BatchJob(output, manifest_inputs(spec.get('inputs'), base, where), {**job_defaults, **options}))
+    return jobs, {name: value for name, value in defaults.items() if name in CONVERSION_OPTIONS}
+
+
+def _convert_to_file(file, target, options, cache):
+    """Process pool entry point: convert file to the PDF target; return the worker's cache statistics."""
+    with open(target, 'wb') as f:
+        _run_converter(file, f, options, cache)
+    return cache.stats() if cache is not None else None
+
+
+def _converted(file, target, ready, budget, cache, future):
+    budget.release()
+    try:
+        cache_stats = future.result()
+    except ConversionError as e:
+        ready.set_exception(e)
+    except Exception as e:
+        ready.set_exception(ConversionError(f"Failed to convert {file}: {e}"))
+    else:
+        if cache_stats:
+            cache.add_stats(cache_stats)
+        ready.set_result(target)
+
+
+def _convert_all(sources, ready, budget, pool, scratch, options, cache, stop):
+    """Convert sources in order, each once a budget slot is free; results go to the ready futures."""
+    for number, file in enumerate(sources):
+        budget.acquire()
+        if stop.is_set():
+            budget.release()
+            return
+        target = os.path.join(scratch, f"{number}.pdf")
+        if pool is not None:
+            future = pool.submit(_convert_to_file, file, target, options, cache)
+            future.add_done_callback(functools.partial(_converted, file, target, ready[file], budget, cache))
+            continue
+        try:
+            _convert_to_file(file, target, options, cache)
+        except ConversionError as e:
+            ready[file].set_exception(e)
+        except Exception as e:
+            ready[file].set_exception(ConversionError(f"Failed to convert {file}: {e}"))
+        else:
+            ready[file].set_result(target)
+        finally:
+            budget.release()
+
+
+def _run_job(job, ready, readers, budget):
+    start = time.monotonic()
+    entries = []
+    sources = {}  # converted PDF -> the input it was converted from
+    for file, pages in job.inputs:
+        future = ready.get(os.path.abspath(file))
+        if future is None:
+            entries.append((file, pages))
+            continue
+        try:
+            converted = future.result()
+        except ConversionError as e:
+            job.errors.append((file, str(e)))
+            continue
+        sources[converted] = file
+        entries.append((converted, pages))
+
+    def source_name(text):
+        for converted, file in sources.items():
+            text = text.replace(converted, file)
+        return text
+
+    if job.errors and job.options.get('strict'):
+        job.status = 'failed'
+    else:
+        directory = os.path.dirname(job.output)
+        with budget, tracing.span('job', output=job.output, inputs=len(entries)):
+            try:
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                result = merge_files(entries, job.output, readers=readers, streaming=True, **job.options)
+            except MergeError as e:
+                job.status = 'failed'
+                job.errors.extend((sources.get(file, file), source_name(message)) for file, message in e.errors)
+                job.errors.append((None, source_name(str(e))))
+            except Exception as e:
+                logger.exception("Job for %s crashed", job.output)
+                job.status = 'failed'
+                job.errors.append((None, f"{type(e).__name__}: {source_name(str(e))}"))
+            else:
+                job.page_count = result.page_count
+                job.errors.extend((sources.get(file, file), source_name(message)) for file, message in result.errors)
+                job.status = 'partial' if job.errors else 'done'
+    job.elapsed = time.monotonic() - start
+    logger.info("%s %s: %d pages in %.2fs", job.status, job.output, job.page_count, job.elapsed)
+
+
+def run_batch(jobs, workers=0, cache=None, image_dpi=None, text_encoding=None, wrap_text=True):
+    """Run jobs (BatchJob objects, updated in place) with a shared budget of workers; return a summary dict.
+
+    workers=0 uses one per CPU.  cache is an optional ConversionCache.  The
+    conversion options apply to every source.
+    """
+    start = time.monotonic()
+    workers = workers or os.cpu_count() or 1
+    options = converter_options(image_dpi, text_encoding, wrap_text)
+
+    # Sources that need converting, in the order the jobs first use them
+    ready = {}
+    sources = []
+    for job in jobs:
+        for file, _ in job.inputs:
+            file = os.path.abspath(file)
+            ext = os.path.splitext(file)[1].lower()
+            if (file not in ready and _needs_conversion(ext) and get_converter(file) is not None
+                    and os.path.exists(file)):
+                ready[file] = concurrent.futures.Future()
+                sources.append(file)
+
+    budget = threading.BoundedSemaphore(workers)
+    readers = SharedReaders()
+    stop = threading.Event()
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(sources) > 1 else None
+    with tempfile.TemporaryDirectory(prefix='filemerger_batch_') as scratch, \
+            tracing.span('batch', jobs=len(jobs), conversions=len(sources), workers=workers):
+        converter = threading.Thread(target=_convert_all, name='batch-convert', daemon=True,
+                                     args=(sources, ready, budget, pool, scratch, options, cache, stop))
+        converter.start()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                       thread_name_prefix='batch-job') as jobs_pool:
+                for future in [jobs_pool.submit(_run_job, job, ready, readers, budget) for job in jobs]:
+                    future.result()
+        finally:
+            # Every job has released its slot, so the converter can finish its loop
+            stop.set()
+            converter.join()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            readers.close()
+
+    summary = {'jobs': len(jobs), 'conversions': len(sources), 'workers': workers,
+               'pages': sum(job.page_count for job in jobs), 'elapsed': time.monotonic() - start}
+    for status in ('done', 'partial', 'failed'):
+        summary[status] = sum(job.status == status for job in jobs)
+    return summary
+
+
+def write_report(path, jobs, summary):
+    """Write the summary and the report of every job as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'jobs': [job.report() for job in jobs]}, f, indent=2)
@@ -0,0 +1,180 @@
+"""Persistent, content-addressed cache of converted PDFs.
+
+Entries are keyed by the SHA-256 of the input file plus the converter name,
+its version and its options, so a renamed or copied template still hits and
+an edited one misses.  The cache is capped in bytes; the least recently used
+entries are evicted first, using file mtimes that are bumped on every hit.
+Entries are written to a temp file and renamed into place, so processes
+sharing a cache directory never see partial files.  Copies of a cache sent
+to worker processes do not evict: the bytes they store are reported back
+through add_stats(), and the parent process evicts for them.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+_HASH_CHUNK = 1024 * 1024
+# Temp files older than this were left behind by a crashed writer
+_STALE_TEMP_AGE = 3600
+
+
+def file_digest(path):
+    """Return the hex SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """Size-bounded LRU store of converted PDFs in a directory."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._size_estimate = None
+        self._evicts = True
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.stored_bytes = 0
+
+    def __getstate__(self):
+        # Copies sent to worker processes count their own statistics from zero and leave eviction to this one
+        state = self.__dict__.copy()
+        for name in ('hits', 'misses', 'stores', 'evictions', 'stored_bytes'):
+            state[name] = 0
+        state['_size_estimate'] = None
+        state['_evicts'] = False
+        return state
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores, 'evictions': self.evictions,
+                'stored_bytes': self.stored_bytes}
+
+    def add_stats(self, stats):
+        """Fold in statistics counted by a copy of this cache in another process, and evict for its stores."""
+        self.hits += stats['hits']
+        self.misses += stats['misses']
+        self.stores += stats['stores']
+        self.evictions += stats['evictions']
+        self.stored_bytes += stats['stored_bytes']
+        if stats['stored_bytes'] and self._evicts:
+            self._grow(stats['stored_bytes'])
+
+    def key(self, path, converter, version, options=None):
+        """Cache key for converting path with a converter at a given version and options."""
+        parts = [file_digest(path), converter, str(version)]
+        parts.extend(f"{name}={value!r}" for name, value in sorted((options or {}).items()))
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.pdf')
+
+    def fetch(self, key, output):
+        """Copy the cached PDF for key into the binary file output; return False on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                shutil.copyfileobj(f, output)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return True
+
+    def store(self, key, source):
+        """Store the PDF read from the binary file source under key."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                shutil.copyfileobj(source, f)
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self.stores += 1
+        self.stored_bytes += size
+        if self._evicts:
+            self._grow(size)
+
+    def _grow(self, size):
+        """Account for size bytes newly stored, evicting if the cache has outgrown max_bytes."""
+        if self._size_estimate is None:
+            # The scan already counts the new entries
+            self._size_estimate = self._scan()[1]
+        else:
+            self._size_estimate += size
+        if self._size_estimate > self.max_bytes:
+            self.evict()
+
+    def _scan(self):
+        """Return ([(mtime, size, path)], total size) for all entries."""
+        entries = []
+        total = 0
+        now = time.time()
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith('.tmp'):
+                    if now - stat.st_mtime > _STALE_TEMP_AGE:
+                        self._remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        return entries, total
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Another process evicted it first
+            return False
+        return True
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries, total = self._scan()
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                self.evictions += 1
+                logger.debug("Evicted %s from conversion cache", path)
+            total -= size
+        self._size_estimate = total
+
+    def clear(self):
+        for _, _, path in self._scan()[0]:
+            self._remove(path)
+        self._size_estimate = 0
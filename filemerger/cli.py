@@ -0,0 +1,277 @@
+"""Command line entry point: ``python -m filemerger merge -o out.pdf a.pdf b.jpg``."""
+import argparse
+import logging
+import os
+import re
+import sys
+
+# An input may carry a page selection after '@', e.g. report.pdf@1,3-5
+_PAGE_SUFFIX = re.compile(r"^(?P<path>.+)@(?P<pages>[\d,\-\s]+)$")
+
+
+def split_input_spec(spec):
+    """Split "path[@pages]" into (path, pages text or None)."""
+    if not os.path.exists(spec):
+        match = _PAGE_SUFFIX.match(spec)
+        if match:
+            return match.group('path'), match.group('pages')
+    return spec, None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="filemerger",
+        description="Merge PDF, DOCX, TXT, JPG and PNG files into a single PDF.")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="log progress (-vv for per-stage timings)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record per-stage timings to FILE: JSON lines if it ends in .jsonl, "
+                             "otherwise Chrome trace format")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    merge = subparsers.add_parser("merge", help="merge inputs into one PDF")
+    merge.add_argument("inputs", nargs="+", metavar="INPUT",
+                       help="input file, optionally with pages after '@' (report.pdf@1,3-5)")
+    merge.add_argument("-o", "--output", required=True, help="output PDF path")
+    merge.add_argument("--strict", action="store_true",
+                       help="abort on the first input that fails instead of skipping it")
+    merge.add_argument("--preflight", choices=("abort", "skip", "warn"),
+                       help="check every input before converting any: abort on problems, skip the bad inputs, "
+                            "or only warn")
+    merge.add_argument("-j", "--jobs", type=int, default=None, metavar="N",
+                       help="convert inputs on N worker processes (0 = one per CPU)")
+    merge.add_argument("--image-dpi", type=int, default=None, metavar="DPI",
+                       help="downsample images placed at more than DPI dots per inch")
+    merge.add_argument("--text-encoding", metavar="ENCODING",
+                       help="encoding of TXT inputs (default: utf-8)")
+    merge.add_argument("--no-wrap", dest="wrap_text", action="store_false",
+                       help="clip TXT lines at the right margin instead of wrapping them")
+    merge.add_argument("--cache-dir", metavar="DIR",
+                       help="reuse converted DOCX, TXT and image files from this directory")
+    merge.add_argument("--cache-size", type=int, default=1024, metavar="MB",
+                       help="evict least recently used cache entries above this size (default: 1024)")
+    merge.add_argument("--stream", action="store_true",
+                       help="write pages to disk as they are merged; keeps memory flat but drops outlines")
+    merge.add_argument("--memory-limit", type=int, default=64, metavar="MB",
+                       help="with --stream, release cached source objects after copying this much (default: 64)")
+    merge.add_argument("--mmap", action="store_true",
+                       help="read source PDFs through memory mappings, copying their streams without "
+                            "buffering them (implies --stream)")
+    merge.add_argument("--dedup", action="store_true",
+                       help="store identical fonts and images once across inputs (implies --stream)")
+    merge.add_argument("--compress", action="store_true",
+                       help="deflate streams stored uncompressed, on all cores (implies --stream)")
+    merge.add_argument("--object-streams", action="store_true",
+                       help="pack objects into compressed object streams, PDF 1.5 (implies --stream)")
+    merge.add_argument("--linearize", action="store_true",
+                       help="write a linearized PDF for fast web view (needs pikepdf or qpdf)")
+    merge.set_defaults(handler=run_merge)
+
+    serve = subparsers.add_parser("serve", help="run a local merge daemon that queues jobs from clients")
+    address = serve.add_mutually_exclusive_group()
+    address.add_argument("--port", type=int, default=8765, help="localhost TCP port (default: 8765)")
+    address.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead")
+    serve.add_argument("--host", default="127.0.0.1", help="address to bind with --port (default: 127.0.0.1)")
+    serve.add_argument("-c", "--concurrency", type=int, default=2, metavar="N",
+                       help="merges run at the same time (default: 2)")
+    serve.add_argument("--max-queued", type=int, default=100, metavar="N",
+                       help="refuse new jobs with 429 beyond this many queued (default: 100)")
+    serve.add_argument("--max-per-client", type=int, default=20, metavar="N",
+                       help="queued jobs allowed per client (default: 20)")
+    serve.add_argument("--cache-dir", metavar="DIR", help="conversion cache shared by all jobs")
+    serve.add_argument("--cache-size", type=int, default=1024, metavar="MB",
+                       help="evict least recently used cache entries above this size (default: 1024)")
+    serve.set_defaults(handler=run_serve)
+
+    watch = subparsers.add_parser("watch", help="keep an output PDF up to date with a folder or manifest")
+    watch.add_argument("source", help="directory to merge in name order, or a JSON manifest of inputs")
+    watch.add_argument("-o", "--output", required=True, help="output PDF path")
+    watch.add_argument("--interval", type=float, default=1.0, metavar="SECONDS",
+                       help="how often to poll for changes (default: 1)")
+    watch.add_argument("--debounce", type=float, default=0.5, metavar="SECONDS",
+                       help="rebuild once inputs have been quiet this long (default: 0.5)")
+    watch.add_argument("--once", action="store_true", help="bring the output up to date and exit")
+    watch.add_argument("--stream", action="store_true", help="assemble the output with the streaming writer")
+    watch.set_defaults(handler=run_watch)
+
+    check = subparsers.add_parser("check", help="run the pre-flight checks on inputs without merging them")
+    check.add_argument("inputs", nargs="+", metavar="INPUT",
+                       help="input file, optionally with pages after '@' (report.pdf@1,3-5)")
+    check.add_argument("--text-encoding", metavar="ENCODING",
+                       help="encoding of TXT inputs (default: utf-8)")
+    check.add_argument("--json", action="store_true", help="print the report as JSON")
+    check.set_defaults(handler=run_check)
+
+    batch = subparsers.add_parser("batch", help="run the merge jobs of a JSON or YAML manifest concurrently")
+    batch.add_argument("manifest", help="manifest listing each job's output, inputs and options")
+    batch.add_argument("-j", "--jobs", type=int, default=0, metavar="N",
+                       help="conversions and merges run at the same time (default: one per CPU)")
+    batch.add_argument("--report", metavar="FILE", help="write a JSON report of every job to FILE")
+    batch.add_argument("--cache-dir", metavar="DIR", help="conversion cache shared by all jobs")
+    batch.add_argument("--cache-size", type=int, default=1024, metavar="MB",
+                       help="evict least recently used cache entries above this size (default: 1024)")
+    batch.set_defaults(handler=run_batch)
+    return parser
+
+
+def run_merge(args):
+    from .cache import ConversionCache
+    from .engine import merge_files, parse_page_ranges
+    from .errors import MergeError
+
+    inputs = []
+    for spec in args.inputs:
+        path, pages = split_input_spec(spec)
+        try:
+            inputs.append((path, parse_page_ranges(pages or '')))
+        except ValueError as e:
+            print(f"filemerger: {spec}: {e}", file=sys.stderr)
+            return 2
+
+    cache = ConversionCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+    try:
+        result = merge_files(inputs, args.output, strict=args.strict,
+                             workers=args.jobs, image_dpi=args.image_dpi, cache=cache,
+                             text_encoding=args.text_encoding, wrap_text=args.wrap_text,
+                             streaming=args.stream, memory_limit=args.memory_limit * 1024 * 1024, dedup=args.dedup,
+                             compress=args.compress, object_streams=args.object_streams, linearize=args.linearize,
+                             mmap_inputs=args.mmap, preflight=args.preflight)
+    except MergeError as e:
+        for _, message in e.errors:
+            print(f"filemerger: {message}", file=sys.stderr)
+        print(f"filemerger: {e}", file=sys.stderr)
+        return 1
+    for _, message in result.errors:
+        print(f"filemerger: {message}", file=sys.stderr)
+    print(f"Merged {result.page_count} pages into {result.output_file} in {result.elapsed:.2f}s")
+    if args.dedup:
+        print(f"Sharing identical objects saved about {result.bytes_saved / 1024:.1f} KiB")
+    if cache is not None:
+        logging.getLogger(__name__).info("Conversion cache: %(hits)d hits, %(misses)d misses, "
+                                         "%(stores)d stored, %(evictions)d evicted", cache.stats())
+    return 0 if result.ok else 3
+
+
+def run_serve(args):
+    import asyncio
+
+    from .cache import ConversionCache
+    from .converters import close_docx_pool
+    from .service import MergeService
+
+    cache = ConversionCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+    service = MergeService(concurrency=args.concurrency, max_queued=args.max_queued,
+                           max_per_client=args.max_per_client, cache=cache)
+    address = {'unix_socket': args.socket} if args.socket else {'host': args.host, 'port': args.port}
+    try:
+        asyncio.run(service.serve_forever(**address))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_docx_pool()
+    return 0
+
+
+def run_watch(args):
+    from .errors import MergeError
+    from .watch import FolderWatcher
+
+    watcher = FolderWatcher(args.source, args.output, interval=args.interval, debounce=args.debounce,
+                            streaming=args.stream)
+    if args.once:
+        try:
+            summary = watcher.rebuild()
+        except MergeError as e:
+            print(f"filemerger: {e}", file=sys.stderr)
+            return 1
+        for _, message in summary['errors']:
+            print(f"filemerger: {message}", file=sys.stderr)
+        print(f"Merged {summary['pages']} pages into {args.output} ({summary['converted']} converted, "
+              f"{summary['reused']} reused) in {summary['elapsed']:.2f}s")
+        return 0 if not summary['errors'] else 3
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def run_check(args):
+    import json
+
+    from .engine import parse_page_ranges
+    from .preflight import check_inputs
+
+    inputs = []
+    for spec in args.inputs:
+        path, pages = split_input_spec(spec)
+        try:
+            inputs.append((path, parse_page_ranges(pages or '')))
+        except ValueError as e:
+            print(f"filemerger: {spec}: {e}", file=sys.stderr)
+            return 2
+    report = check_inputs(inputs, text_encoding=args.text_encoding)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        for _, message in report.errors:
+            print(f"error: {message}")
+        for _, message in report.warnings:
+            print(f"warning: {message}")
+        print(f"Checked {len(report.checks)} inputs in {report.elapsed:.2f}s: {len(report.errors)} errors, "
+              f"{len(report.warnings)} warnings")
+    return 0 if report.ok else 1
+
+
+def run_batch(args):
+    from .batch import load_manifest, run_batch as run_jobs, write_report
+    from .cache import ConversionCache
+    from .converters import close_docx_pool
+    from .errors import MergeError
+
+    try:
+        jobs, conversion_options = load_manifest(args.manifest)
+    except MergeError as e:
+        print(f"filemerger: {e}", file=sys.stderr)
+        return 1
+    cache = ConversionCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+    try:
+        summary = run_jobs(jobs, workers=args.jobs, cache=cache, **conversion_options)
+    finally:
+        close_docx_pool()
+    for job in jobs:
+        print(f"{job.status:<8} {job.output}: {job.page_count} pages in {job.elapsed:.2f}s")
+        for _, message in job.errors:
+            print(f"filemerger: {message}", file=sys.stderr)
+    print(f"{summary['done']} of {summary['jobs']} jobs done, {summary['partial']} partial, "
+          f"{summary['failed']} failed; {summary['pages']} pages and {summary['conversions']} conversions "
+          f"in {summary['elapsed']:.2f}s")
+    if args.report:
+        write_report(args.report, jobs, summary)
+    if summary['failed']:
+        return 1
+    return 3 if summary['partial'] else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    level = {0: logging.WARNING, 1: logging.INFO}.get(args.verbose, logging.DEBUG)
+    logging.basicConfig(level=level, format="%(levelname)s %(name)s: %(message)s")
+    sinks = []
+    if args.trace:
+        from .tracing import ChromeTraceSink, JsonLinesSink
+
+        sinks.append(JsonLinesSink(args.trace) if args.trace.endswith('.jsonl') else ChromeTraceSink(args.trace))
+    if level <= logging.DEBUG:
+        from .tracing import LogSink
+
+        sinks.append(LogSink(logging.getLogger('filemerger.tracing'), logging.DEBUG))
+    if not sinks:
+        return args.handler(args)
+    from . import tracing
+
+    tracing.enable(*sinks)
+    try:
+        return args.handler(args)
+    finally:
+        tracing.disable()
@@ -0,0 +1,581 @@
+"""Converters from the supported input formats to PDF.
+
+Each converter takes the input path and an output that is either a path or a
+writable binary file object, so results can go straight into an in-memory
+buffer.  The converters register themselves in filemerger.registry.  Every
+third-party library is imported inside the converter that needs it, so
+importing this module costs nothing and a TXT-only merge never loads Pillow
+or comtypes.  Failures are raised as ConversionError.
+"""
+import bisect
+import contextlib
+import csv
+import functools
+import io
+import itertools
+import logging
+import math
+import multiprocessing.util
+import os
+import shlex
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+from .errors import ConversionError
+from .pdfraw import RawPdfWriter
+from .registry import register_converter
+from .workers import CommandBackend, WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# US letter in points, the page size used for converted images and text
+LETTER = (612.0, 792.0)
+
+# Word's wdFormatPDF constant, used when the type library cannot be loaded
+WD_FORMAT_PDF = 17
+
+
+class WordBackend:
+    """Microsoft Word driven through COM.
+
+    COM is initialized and Word is started on the first conversion; the same
+    Word instance then serves every later document until close().  COM
+    starts Word outside the worker's process tree, so its pid is reported
+    through on_process before each document, for the pool to kill if the
+    conversion hangs.
+    """
+
+    def __init__(self):
+        self._initialized = False
+        self._error = None
+        self._word = None
+        self._pid = None
+        self.wd_format_pdf = WD_FORMAT_PDF
+        self.on_process = None
+
+    def _initialize(self):
+        if self._initialized:
+            return
+        if self._error is not None:
+            raise ConversionError(self._error)
+        try:
+            import comtypes
+            import comtypes.client
+            comtypes.CoInitialize()
+        except Exception as e:
+            self._error = (f"Microsoft Word COM initialization failed: {e}. Ensure Word is installed, "
+                           "run as administrator, and check 32/64-bit compatibility.")
+            raise ConversionError(self._error) from e
+        # Try to load type library for constants
+        try:
+            comtypes.client.GetModule(['{000209FF-0000-0000-C000-000000000046}'])
+            from comtypes.gen import Word
+            self.wd_format_pdf = Word.wdFormatPDF
+        except Exception:
+            pass
+        self._initialized = True
+        logger.debug("COM module for Word initialized")
+
+    def _application(self):
+        if self._word is None:
+            import comtypes.client
+            running = _word_pids()
+            self._word = comtypes.client.CreateObject('Word.Application', dynamic=True)
+            started = _word_pids() - running
+            self._pid = started.pop() if len(started) == 1 else None
+            self._word.Visible = False
+            self._word.DisplayAlerts = False
+        return self._word
+
+    def convert(self, docx_path, output_pdf):
+        """Save docx_path as PDF to the path output_pdf."""
+        self._initialize()
+        doc = None
+        try:
+            word = self._application()
+            if self._pid is not None and self.on_process is not None:
+                self.on_process(self._pid)
+            doc = word.Documents.Open(os.path.abspath(docx_path))
+            _save_as_pdf(doc, os.path.abspath(output_pdf), self.wd_format_pdf)
+        except Exception:
+            # Word may be left in a bad state; start a fresh instance next time
+            self._quit()
+            raise
+        finally:
+            try:
+                if doc:
+                    doc.Close()
+            except Exception:
+                pass
+
+    def _quit(self):
+        try:
+            if self._word:
+                self._word.Quit()
+        except Exception:
+            pass
+        self._word = None
+        self._pid = None
+
+    def close(self):
+        self._quit()
+        if self._initialized:
+            try:
+                import comtypes
+                comtypes.CoUninitialize()
+            except Exception:
+                pass
+            self._initialized = False
+
+
+def _word_pids():
+    """Return the pids of the running WINWORD.EXE processes."""
+    try:
+        listing = subprocess.run(['tasklist', '/FI', 'IMAGENAME eq WINWORD.EXE', '/FO', 'CSV', '/NH'],
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    except OSError:
+        return set()
+    return {int(row[1]) for row in csv.reader(listing.splitlines()) if len(row) > 1 and row[1].isdigit()}
+
+
+def _save_as_pdf(doc, abs_output, wd_format_pdf):
+    # Try multiple save methods to handle version differences
+    try:
+        doc.SaveAs2(abs_output, FileFormat=wd_format_pdf)
+        logger.debug("Used SaveAs2 with FileFormat")
+    except (AttributeError, TypeError):
+        try:
+            doc.SaveAs(abs_output, FileFormat=wd_format_pdf)
+            logger.debug("Used SaveAs with FileFormat")
+        except (AttributeError, TypeError):
+            try:
+                doc.SaveAs(abs_output, wd_format_pdf)  # Positional argument
+                logger.debug("Used SaveAs with positional FileFormat")
+            except (AttributeError, TypeError):
+                try:
+                    doc.ExportAsFixedFormat(abs_output, OutputFormat=wd_format_pdf)
+                    logger.debug("Used ExportAsFixedFormat")
+                except (AttributeError, TypeError):
+                    doc.SaveAs(abs_output)  # Try without format parameter
+                    logger.debug("Used SaveAs without format parameter")
+
+
+def _remove_file(path):
+    # Word may hold the file briefly after closing the document
+    for _ in range(5):
+        try:
+            os.remove(path)
+            return
+        except FileNotFoundError:
+            return
+        except PermissionError:
+            time.sleep(0.1)
+    logger.warning("Could not delete temp file %s", path)
+
+
+_docx_pool = None
+_docx_pool_lock = threading.Lock()
+_docx_backend_factory = None
+_docx_pool_options = {'size': 1, 'max_jobs': 100, 'job_timeout': 300}
+
+
+def _default_docx_backend_factory():
+    # FILEMERGER_DOCX_COMMAND selects a command line backend, e.g.
+    # "soffice --headless --convert-to pdf --outdir {outdir} {input}"
+    command = os.environ.get('FILEMERGER_DOCX_COMMAND')
+    if command:
+        return functools.partial(CommandBackend, shlex.split(command))
+    return WordBackend
+
+
+def configure_docx_backend(backend_factory=None, **pool_options):
+    """Choose the backend docx_to_pdf uses and the settings of its worker pool.
+
+    backend_factory builds a backend inside each worker process (see
+    filemerger.workers); pool_options are passed to WorkerPool.  A running
+    pool is shut down and replaced on the next conversion.
+    """
+    global _docx_backend_factory
+    close_docx_pool()
+    _docx_backend_factory = backend_factory
+    _docx_pool_options.update(pool_options)
+
+
+def get_docx_pool():
+    """Return the process-wide DOCX worker pool, starting it on first use."""
+    global _docx_pool
+    # Merges on several threads (the service, batch jobs) must not each start a pool
+    with _docx_pool_lock:
+        if _docx_pool is None:
+            factory = _docx_backend_factory or _default_docx_backend_factory()
+            _docx_pool = WorkerPool(factory, **_docx_pool_options)
+            # Stop the workers (and quit Word) before multiprocessing kills daemonic children at exit
+            multiprocessing.util.Finalize(None, close_docx_pool, exitpriority=10)
+        return _docx_pool
+
+
+def close_docx_pool():
+    global _docx_pool
+    with _docx_pool_lock:
+        pool, _docx_pool = _docx_pool, None
+    if pool is not None:
+        pool.close()
+
+
+def docx_supported():
+    """Cheap check for DOCX support that does not start a backend."""
+    if _docx_backend_factory is not None or os.environ.get('FILEMERGER_DOCX_COMMAND'):
+        return True
+    if sys.platform != 'win32':
+        return False
+    try:
+        import comtypes.client  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _open_output(output_pdf):
+    if isinstance(output_pdf, (str, os.PathLike)):
+        return open(output_pdf, 'wb')
+    return contextlib.nullcontext(output_pdf)
+
+
+def _fmt(value):
+    return b"%.4f" % value
+
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_PNG_COLORS = {0: 1, 2: 3, 3: 1}  # colour type -> components; alpha types are not embeddable
+
+
+def _read_png(image_path):
+    """Read an 8-bit-or-less, non-interlaced PNG without alpha for direct embedding.
+
+    Returns (width, height, bit_depth, color_type, palette, idat) or None when
+    the image needs to be decoded instead.
+    """
+    idat = []
+    palette = None
+    header = None
+    with open(image_path, 'rb') as f:
+        if f.read(8) != _PNG_SIGNATURE:
+            return None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            length, chunk_type = struct.unpack('>I4s', chunk_header)
+            data = f.read(length)
+            f.seek(4, os.SEEK_CUR)  # CRC
+            if chunk_type == b'IHDR':
+                width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data)
+                if interlace or bit_depth > 8 or color_type not in _PNG_COLORS:
+                    return None
+                header = (width, height, bit_depth, color_type)
+            elif chunk_type == b'PLTE':
+                palette = data
+            elif chunk_type == b'tRNS':
+                return None
+            elif chunk_type == b'IDAT':
+                idat.append(data)
+            elif chunk_type == b'IEND':
+                break
+    if header is None or (header[3] == 3 and palette is None):
+        return None
+    return header + (palette, b''.join(idat))
+
+
+def _png_xobject(png):
+    width, height, bit_depth, color_type, palette, idat = png
+    if color_type == 3:
+        color_space = b"[/Indexed /DeviceRGB %d <%s>]" % (len(palette) // 3 - 1, palette.hex().encode('ascii'))
+    elif color_type == 0:
+        color_space = b"/DeviceGray"
+    else:
+        color_space = b"/DeviceRGB"
+    entries = (b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent %d "
+               b"/Filter /FlateDecode /DecodeParms << /Predictor 15 /Colors %d /BitsPerComponent %d /Columns %d >>"
+               % (width, height, color_space, bit_depth, _PNG_COLORS[color_type], bit_depth, width))
+    return entries, idat
+
+
+def _jpeg_xobject(img, data):
+    color_space = {'L': b"/DeviceGray", 'RGB': b"/DeviceRGB", 'CMYK': b"/DeviceCMYK"}[img.mode]
+    entries = (b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 "
+               b"/Filter /DCTDecode" % (img.size[0], img.size[1], color_space))
+    if img.mode == 'CMYK' and 'adobe' in img.info:
+        entries += b" /Decode [1 0 1 0 1 0 1 0]"  # Adobe CMYK JPEGs store inverted values
+    return entries, data
+
+
+def _decoded_xobject(img, max_size=None):
+    """Decode img once and embed it; shrink it to max_size first if given."""
+    is_jpeg = img.format == 'JPEG' and img.mode in ('L', 'RGB')
+    if max_size:
+        # thumbnail() uses JPEG draft decoding, so the full-size image is never held in memory
+        img.thumbnail(max_size, reducing_gap=2.0)
+    if is_jpeg:
+        data = io.BytesIO()
+        img.save(data, 'JPEG', quality=85)
+        return _jpeg_xobject(img, data.getvalue())
+    if img.mode not in ('L', 'RGB'):
+        img = img.convert('RGB')
+    color_space = b"/DeviceGray" if img.mode == 'L' else b"/DeviceRGB"
+    entries = (b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 "
+               b"/Filter /FlateDecode" % (img.size[0], img.size[1], color_space))
+    return entries, zlib.compress(img.tobytes(), 6)
+
+
+def _write_image_page(output_pdf, image, x_offset, y_offset, width, height, page_size):
+    entries, data = image
+    with _open_output(output_pdf) as f:
+        pdf = RawPdfWriter(f)
+        catalog, pages, page, content, xobject = (pdf.reserve() for _ in range(5))
+        pdf.write_object(catalog, b"<< /Type /Catalog /Pages %d 0 R >>" % pages)
+        pdf.write_object(pages, b"<< /Type /Pages /Kids [%d 0 R] /Count 1 >>" % page)
+        pdf.write_object(page, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] "
+                               b"/Resources << /XObject << /Im0 %d 0 R >> "
+                               b"/ProcSet [/PDF /ImageB /ImageC /ImageI] >> "
+                               b"/Contents %d 0 R >>" % (pages, _fmt(page_size[0]), _fmt(page_size[1]), xobject,
+                                                         content))
+        pdf.write_stream(content, b"", b"q %s 0 0 %s %s %s cm /Im0 Do Q" % (
+            _fmt(width), _fmt(height), _fmt(x_offset), _fmt(y_offset)))
+        pdf.write_stream(xobject, entries, data)
+        pdf.close(catalog)
+
+
+# Function to convert an image (JPG or PNG) to PDF
+def image_to_pdf(image_path, output_pdf, target_dpi=None):
+    """Place an image centred on a letter page.
+
+    Baseline and progressive JPEGs are embedded as-is (DCTDecode) and PNGs
+    without alpha or interlacing reuse their zlib data (FlateDecode), so
+    neither is decoded.  Other images are decoded once.  With target_dpi,
+    images whose placed resolution exceeds it are decoded at reduced size.
+    """
+    try:
+        from PIL import Image
+
+        with Image.open(image_path) as img:
+            # Image.open only parses the header; pixel data is read on demand
+            img_width, img_height = img.size
+            page_width, page_height = LETTER
+            scale = min(page_width / img_width, page_height / img_height)
+            new_width, new_height = img_width * scale, img_height * scale
+            x_offset, y_offset = (page_width - new_width) / 2, (page_height - new_height) / 2
+
+            max_size = None
+            if target_dpi:
+                max_size = (math.ceil(new_width / 72 * target_dpi), math.ceil(new_height / 72 * target_dpi))
+                if max_size[0] >= img_width and max_size[1] >= img_height:
+                    max_size = None
+
+            image = None
+            if max_size is None:
+                if img.format == 'JPEG' and img.mode in ('L', 'RGB', 'CMYK'):
+                    with open(image_path, 'rb') as f:
+                        image = _jpeg_xobject(img, f.read())
+                elif img.format == 'PNG':
+                    png = _read_png(image_path)
+                    if png is not None:
+                        image = _png_xobject(png)
+            if image is None:
+                image = _decoded_xobject(img, max_size)
+
+        _write_image_page(output_pdf, image, x_offset, y_offset, new_width, new_height, LETTER)
+    except Exception as e:
+        raise ConversionError(f"Failed to convert {image_path}: {e}") from e
+
+
+# Function to convert a DOCX file to PDF on the pooled Word (or command line) backend
+def docx_to_pdf(docx_path, output_pdf):
+    pool = get_docx_pool()
+    # Backends can only save to a path; give each conversion its own temp file
+    temp_pdf = None
+    try:
+        if isinstance(output_pdf, (str, os.PathLike)):
+            pool.convert(docx_path, output_pdf)
+        else:
+            fd, temp_pdf = tempfile.mkstemp(suffix='.pdf', prefix='filemerger_')
+            os.close(fd)
+            pool.convert(docx_path, temp_pdf)
+            with open(temp_pdf, 'rb') as f:
+                shutil.copyfileobj(f, output_pdf)
+    except ConversionError:
+        raise
+    except Exception as e:
+        raise ConversionError(f"Failed to convert {docx_path}: {e}") from e
+    finally:
+        if temp_pdf:
+            _remove_file(temp_pdf)
+
+
+# Helvetica advance widths (1/1000 em) for WinAnsiEncoding byte values
+_HELVETICA_WIDTHS = (
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584, 350,
+    556, 350, 222, 556, 333, 1000, 556, 556, 333, 1000, 667, 333, 1000, 350, 611, 350,
+    350, 222, 222, 333, 333, 350, 556, 1000, 333, 1000, 500, 333, 944, 350, 500, 667,
+    278, 333, 556, 556, 556, 556, 260, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 556, 537, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    667, 667, 667, 667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 500, 556, 556, 556, 556, 278, 278, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 584, 611, 556, 556, 556, 556, 500, 556, 500,
+)
+_TEXT_FONT_SIZE = 12
+_TEXT_LEADING = 15
+_TEXT_MARGIN = 50
+_TEXT_TOP = 750
+_TEXT_LINES_PER_PAGE = (_TEXT_TOP - _TEXT_MARGIN) // _TEXT_LEADING + 1
+# Line width available between the margins, in the 1/1000 em units of the width table
+_TEXT_MAX_WIDTH = (LETTER[0] - 2 * _TEXT_MARGIN) * 1000 / _TEXT_FONT_SIZE
+_TEXT_CHUNK = 1024 * 1024
+# A line with no newline for this long is broken, so one huge line cannot exhaust memory
+_TEXT_MAX_LINE = 64 * 1024
+# Control characters other than newline have no glyph; tabs are expanded before these are deleted
+_TEXT_CONTROL = bytes(c for c in range(32) if c != 10) + b"\x7f"
+_TEXT_ESCAPES = {ord('\\'): b"\\\\", ord('('): b"\\(", ord(')'): b"\\)"}
+# Encodings in which an all-ASCII chunk is already valid WinAnsi text
+_ASCII_COMPATIBLE = {'utf-8', 'ascii', 'latin-1', 'iso8859-1', 'cp1252'}
+
+
+def _text_lines(txt_path, encoding):
+    """Yield the lines of a text file as WinAnsi bytes, reading it in chunks.
+
+    Tabs are expanded and control characters removed a whole chunk at a
+    time rather than line by line.
+    """
+    import codecs
+
+    codec = codecs.lookup(encoding)
+    decoder = codec.incrementaldecoder(errors='replace')
+    fast_path = codec.name in _ASCII_COMPATIBLE
+    pending = b""
+    with open(txt_path, 'rb') as f:
+        while True:
+            chunk = f.read(_TEXT_CHUNK)
+            final = not chunk
+            if fast_path and chunk.isascii() and not decoder.getstate()[0]:
+                data = chunk
+            else:
+                data = decoder.decode(chunk, final).encode('cp1252', 'replace')
+            data = pending + data
+            cut = data.rfind(b"\n") + 1
+            pending = data[cut:]
+            if cut:
+                lines = data[:cut].expandtabs(8).translate(None, _TEXT_CONTROL).split(b"\n")
+                lines.pop()
+                yield from lines
+            while len(pending) > _TEXT_MAX_LINE:
+                yield pending[:_TEXT_MAX_LINE].expandtabs(8).translate(None, _TEXT_CONTROL)
+                pending = pending[_TEXT_MAX_LINE:]
+            if final:
+                break
+    if pending:
+        yield pending.expandtabs(8).translate(None, _TEXT_CONTROL)
+
+
+def _wrap_line(line):
+    """Split a line into pieces that fit between the margins, at spaces where possible."""
+    if len(line) * 1015 <= _TEXT_MAX_WIDTH:
+        # Even a line of the widest glyph fits
+        return [line]
+    ends = list(itertools.accumulate(map(_HELVETICA_WIDTHS.__getitem__, line)))
+    if ends[-1] <= _TEXT_MAX_WIDTH:
+        return [line]
+    pieces = []
+    start = 0
+    while start < len(line):
+        offset = ends[start - 1] if start else 0
+        end = bisect.bisect_right(ends, offset + _TEXT_MAX_WIDTH, start)
+        if end >= len(line):
+            pieces.append(line[start:])
+            break
+        end = max(end, start + 1)
+        space = line.rfind(b" ", start, end)
+        if space > start:
+            end = space + 1
+        pieces.append(line[start:end].rstrip(b" "))
+        start = end
+    return pieces
+
+
+def _text_pages(lines, wrap):
+    """Group lines into pages of at most _TEXT_LINES_PER_PAGE display lines."""
+    page = []
+    for line in lines:
+        for piece in (_wrap_line(line) if wrap else (line,)):
+            page.append(piece)
+            if len(page) == _TEXT_LINES_PER_PAGE:
+                yield page
+                page = []
+    if page:
+        yield page
+
+
+def _text_content(page, clip):
+    parts = [b"q %s %s %s %s re W n " % (_fmt(_TEXT_MARGIN), b"0", _fmt(LETTER[0] - 2 * _TEXT_MARGIN),
+                                         _fmt(LETTER[1])) if clip else b"q ",
+             b"BT /F1 %d Tf %d TL %d %d Td\n" % (_TEXT_FONT_SIZE, _TEXT_LEADING, _TEXT_MARGIN, _TEXT_TOP)]
+    for number, line in enumerate(page):
+        if b"\\" in line or b"(" in line or b")" in line:
+            line = b"".join(_TEXT_ESCAPES.get(byte, bytes((byte,))) for byte in line)
+        # ' moves to the next line before showing the text
+        parts.append(b"(%s) %s\n" % (line, b"'" if number else b"Tj"))
+    parts.append(b"ET Q")
+    return b"".join(parts)
+
+
+# Function to convert a TXT file to PDF
+def txt_to_pdf(txt_path, output_pdf, encoding='utf-8', wrap=True):
+    """Set a text file in 12 pt Helvetica on letter pages.
+
+    The file is read in chunks and each page is written as soon as it is
+    full, so memory stays flat however large the file is.  Lines too wide
+    for the page are wrapped, at a space where possible, or clipped at the
+    right margin with wrap=False.  Characters outside WinAnsiEncoding are
+    replaced with '?'.
+    """
+    try:
+        with _open_output(output_pdf) as f:
+            pdf = RawPdfWriter(f)
+            catalog, pages, resources = pdf.reserve(), pdf.reserve(), pdf.reserve()
+            pdf.write_object(resources, b"<< /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                        b"/Encoding /WinAnsiEncoding >> >> /ProcSet [/PDF /Text] >>")
+            kids = []
+            for page in itertools.chain(_text_pages(_text_lines(txt_path, encoding), wrap), [None]):
+                if page is None and kids:
+                    break
+                page_id, content = pdf.reserve(), pdf.reserve()
+                data = zlib.compress(_text_content(page or [], not wrap), 1)
+                pdf.write_stream(content, b"/Filter /FlateDecode", data)
+                pdf.write_object(page_id, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Resources %d 0 R "
+                                          b"/Contents %d 0 R >>" % (pages, _fmt(LETTER[0]), _fmt(LETTER[1]),
+                                                                   resources, content))
+                kids.append(page_id)
+            pdf.write_object(pages, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+                b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)))
+            pdf.write_object(catalog, b"<< /Type /Catalog /Pages %d 0 R >>" % pages)
+            pdf.close(catalog)
+    except Exception as e:
+        raise ConversionError(f"Failed to convert {txt_path}: {e}") from e
+
+
+register_converter(image_to_pdf, ('.jpg', '.png'), ('image/jpeg', 'image/png'), version=2)
+register_converter(txt_to_pdf, ('.txt',), ('text/plain',), version=2)
+register_converter(docx_to_pdf, ('.docx',),
+                   ('application/vnd.openxmlformats-officedocument.wordprocessingml.document',), version=1)
@@ -0,0 +1,811 @@
+"""GUI-free merge engine.
+
+merge_files() converts every input to PDF and concatenates the results.
+Problems with individual inputs are collected in MergeResult.errors and the
+merge carries on; a merge that cannot produce an output raises MergeError.
+"""
+import collections
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from . import tracing
+from .errors import ConversionError, MergeCancelled, MergeError
+from .registry import get_converter
+
+logger = logging.getLogger(__name__)
+
+# Converted intermediates larger than this are spilled from memory to a temp file
+DEFAULT_SPILL_THRESHOLD = 32 * 1024 * 1024
+# Pages appended between progress reports and cancellation checks
+PROGRESS_PAGES = 32
+
+
+class MergeResult:
+    """Outcome of a merge: the output written and the inputs that failed."""
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.page_count = 0
+        self.errors = []  # (input file, message) pairs
+        self.elapsed = 0.0
+        self.bytes_saved = 0  # by sharing identical objects across inputs
+        self.preflight = None  # PreflightReport, when pre-flight checks ran
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def __repr__(self):
+        return (f"MergeResult(output_file={self.output_file!r}, page_count={self.page_count}, "
+                f"errors={len(self.errors)}, elapsed={self.elapsed:.2f})")
+
+
+class MergeProgress(collections.namedtuple(
+        'MergeProgress', 'stage file files_done files_total pages_done bytes_done bytes_total elapsed')):
+    """Snapshot of a running merge, passed to merge_files(on_progress=...).
+
+    stage is 'merge' while inputs are converted and appended, 'write' while
+    the output is written and 'done' at the end.  bytes_done and bytes_total
+    measure work: each input counts for its size on disk, advancing page by
+    page as it is appended.  Unless the merge streams, the pages are copied
+    to the output at the end, and that counts for the size of the inputs
+    again, advancing page by page.
+    """
+
+    __slots__ = ()
+
+    @property
+    def fraction(self):
+        if self.bytes_total:
+            return min(1.0, self.bytes_done / self.bytes_total)
+        return self.files_done / self.files_total if self.files_total else 1.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def pages_per_second(self):
+        return self.pages_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds left, or None until there is progress to go by."""
+        fraction = self.fraction
+        if fraction <= 0 or self.elapsed <= 0:
+            return None
+        return self.elapsed * (1 - fraction) / fraction
+
+
+def parse_page_ranges(text):
+    """Parse a 1-based page spec such as "1,3-5" into 0-based page indexes.
+
+    A blank spec means all pages and returns an empty list.
+    """
+    pages = []
+    if not text.strip():
+        return pages
+    for part in text.split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = map(int, part.split('-'))
+            if start < 1 or end < start:
+                raise ValueError(f"Invalid page range {part!r}")
+            pages.extend(range(start - 1, end))
+        else:
+            page = int(part)
+            if page < 1:
+                raise ValueError(f"Invalid page number {part!r}")
+            pages.append(page - 1)
+    return pages
+
+
+def format_page_ranges(pages):
+    """Format 0-based page indexes as a 1-based spec, the inverse of parse_page_ranges."""
+    parts = []
+    start = previous = None
+    for page in list(pages) + [None]:
+        if page is not None and previous is not None and page == previous + 1:
+            previous = page
+            continue
+        if start is not None:
+            parts.append(str(start + 1) if start == previous else f"{start + 1}-{previous + 1}")
+        start = previous = page
+    return ','.join(parts)
+
+
+def new_buffer(spill_threshold=DEFAULT_SPILL_THRESHOLD):
+    """Return a binary buffer for an intermediate PDF.
+
+    The buffer lives in memory until it grows past spill_threshold bytes and
+    is then moved to an anonymous temp file, which is removed when closed.
+    """
+    return tempfile.SpooledTemporaryFile(max_size=spill_threshold, suffix='.pdf')
+
+
+def _new_merger():
+    from PyPDF2 import PdfMerger
+
+    class _BufferMerger(PdfMerger):
+        # PdfMerger copies file objects into a BytesIO before parsing them;
+        # read our buffers in place instead so spilled ones stay on disk
+        def _create_stream(self, fileobj):
+            if hasattr(fileobj, 'read') and hasattr(fileobj, 'seek') and not isinstance(fileobj, (str, bytes)):
+                fileobj.seek(0)
+                return fileobj, None
+            return super()._create_stream(fileobj)
+
+        def append_reader(self, reader, pages):
+            """Append pages (0-based indexes) of an already parsed reader.
+
+            Unlike append(), the reader is not parsed again and stays owned by
+            the caller; outlines and named destinations are not imported.
+            """
+            from PyPDF2._merger import _MergedPage
+
+            for page_number in pages:
+                self.pages.append(_MergedPage(reader.pages[page_number], reader, self.id_count))
+                self.id_count += 1
+
+        def write(self, fileobj, on_page=None):
+            """PdfMerger.write, calling on_page(count) after each page is added.
+
+            The reference to each added page is taken from the new /Kids
+            entry; PdfMerger looks it up with get_reference(), a linear
+            search of every object written so far.
+            """
+            if self.output is None:
+                raise RuntimeError("merger is closed")
+            kids = self.output._pages.get_object()['/Kids']
+            for count, page in enumerate(self.pages, 1):
+                self.output.add_page(page.pagedata)
+                page.out_pagedata = kids[-1]
+                if on_page is not None:
+                    on_page(count)
+            self._write_dests()
+            self._write_outline()
+            self.output.write(fileobj)
+
+    return _BufferMerger()
+
+
+# Function to extract specific pages from a PDF or DOCX
+def extract_pages(input_file, output_file, pages, errors=None, spill_threshold=DEFAULT_SPILL_THRESHOLD,
+                  source_name=None):
+    """Write the selected pages of input_file to output_file.
+
+    input_file is a PDF or DOCX path or a binary file object holding a PDF,
+    in which case source_name names it in messages.  output_file is a path
+    or a writable binary file object.  Out-of-range pages are dropped; if
+    none remain all pages are used and the fallback is recorded in errors.
+    """
+    from PyPDF2 import PdfReader, PdfWriter
+
+    source_file = source_name or input_file
+    converted = None
+    try:
+        if isinstance(input_file, str) and input_file.endswith('.docx'):
+            converted = new_buffer(spill_threshold)
+            get_converter(input_file)(input_file, converted)
+            converted.seek(0)
+            input_file = converted
+
+        reader = PdfReader(input_file)
+        total_pages = len(reader.pages)
+        valid_pages = [p for p in pages if 0 <= p < total_pages]
+        if not valid_pages:
+            if errors is not None:
+                errors.append((source_file, f"No valid pages selected for {source_file}. Using all pages."))
+            valid_pages = list(range(total_pages))  # Use all pages if invalid
+
+        with tracing.span('extract', file=source_file, pages=len(valid_pages)):
+            writer = PdfWriter()
+            for page_num in valid_pages:
+                writer.add_page(reader.pages[page_num])
+            writer.write(output_file)
+    except ConversionError:
+        raise
+    except Exception as e:
+        raise ConversionError(f"Failed to extract pages from {source_file}: {e}") from e
+    finally:
+        if converted is not None:
+            converted.close()
+    return output_file
+
+
+_umask_lock = threading.Lock()
+
+
+def replace_file(temp_path, path):
+    """Atomically move a temp file created by mkstemp over path, with the permissions open() would give."""
+    # mkstemp creates the file private to its owner.  umask can only be read by setting it,
+    # so concurrent merges take turns
+    with _umask_lock:
+        umask = os.umask(0)
+        os.umask(umask)
+    os.chmod(temp_path, 0o666 & ~umask)
+    os.replace(temp_path, path)
+
+
+def converter_options(image_dpi=None, text_encoding=None, wrap_text=True):
+    """Return the keyword arguments for each converter, by converter name."""
+    options = {}
+    if image_dpi:
+        options['image_to_pdf'] = {'target_dpi': image_dpi}
+    if text_encoding or not wrap_text:
+        options['txt_to_pdf'] = {'encoding': text_encoding or 'utf-8', 'wrap': wrap_text}
+    return options
+
+
+def _needs_conversion(ext):
+    return ext != '.pdf'
+
+
+def _run_converter(file, output, options, cache):
+    """Convert file into output, reusing a cached conversion when there is one."""
+    converter = get_converter(file)
+    kwargs = options.get(converter.name, {})
+    with tracing.span('convert', file=file, converter=converter.name) as span:
+        if tracing.enabled():
+            span.set(size=os.path.getsize(file))
+        if cache is None:
+            converter(file, output, **kwargs)
+            return
+        try:
+            key = cache.key(file, converter.name, converter.version, kwargs)
+        except OSError as e:
+            raise ConversionError(f"Failed to read {file}: {e}") from e
+        start = output.tell()
+        if cache.fetch(key, output):
+            span.set(cached=True)
+            return
+        span.set(cached=False)
+        converter(file, output, **kwargs)
+        output.seek(start)
+        try:
+            cache.store(key, output)
+        except OSError as e:
+            logger.warning("Could not cache conversion of %s: %s", file, e)
+
+
+def _convert_to_bytes(file, options, cache):
+    """Process pool entry point: convert one input and return its PDF bytes.
+
+    Also returns the worker's cache statistics, which the parent folds into
+    its own cache object, and when the conversion started and ended so the
+    parent can trace it.
+    """
+    output = io.BytesIO()
+    start = time.perf_counter()
+    _run_converter(file, output, options, cache)
+    return output.getvalue(), cache.stats() if cache is not None else None, (start, time.perf_counter())
+
+
+def _serial_sources(items, converted, spill_threshold, options, cache, advance, check_cancel):
+    """Convert items one by one, yielding (item, source) in order.
+
+    source is the input path for PDFs, a buffer holding the converted PDF,
+    or the ConversionError raised for the item.  A file listed more than
+    once is converted once and its buffer yielded for every entry.  Results
+    are recorded in converted (path -> source); the caller closes the
+    buffers once the output is written.  check_cancel is called before each
+    conversion and raises MergeCancelled to stop.
+    """
+    for item in items:
+        file, ext, _ = item
+        check_cancel()
+        if _needs_conversion(ext) and file not in converted:
+            buffer = new_buffer(spill_threshold)
+            try:
+                _run_converter(file, buffer, options, cache)
+            except ConversionError as e:
+                buffer.close()
+                converted[file] = e
+            else:
+                converted[file] = buffer
+        advance()
+        yield item, converted.get(file, file)
+
+
+def _parallel_sources(items, converted, workers, spill_threshold, options, cache, advance, check_cancel):
+    """Like _serial_sources, but convert on a pool of worker processes.
+
+    Conversions finish in any order; each result is held until every item
+    before it has been yielded, so the caller still sees list order.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    futures = {}
+    submitted = set()
+    try:
+        for file, ext, _ in items:
+            if _needs_conversion(ext) and file not in submitted:
+                submitted.add(file)
+                futures[pool.submit(_convert_to_bytes, file, options, cache)] = file
+        pending = set(futures)
+        first_use = set()
+        for item in items:
+            file, ext, _ = item
+            while _needs_conversion(ext) and file not in converted:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                check_cancel()
+                for future in done:
+                    done_file = futures[future]
+                    try:
+                        data, cache_stats, (start, end) = future.result()
+                    except ConversionError as e:
+                        converted[done_file] = e
+                    except Exception as e:
+                        converted[done_file] = ConversionError(f"Failed to convert {done_file}: {e}")
+                    else:
+                        if cache_stats:
+                            cache.add_stats(cache_stats)
+                        tracing.record('convert', start, end, file=done_file, bytes=len(data), worker=True)
+                        buffer = new_buffer(spill_threshold)
+                        buffer.write(data)
+                        converted[done_file] = buffer
+                    # Progress for the first entry of each file is counted when its conversion ends
+                    first_use.add(done_file)
+                    advance()
+            if file in first_use:
+                first_use.discard(file)
+            else:
+                advance()
+            yield item, converted.get(file, file)
+    except MergeCancelled:
+        # Conversions already running finish in the background instead of delaying the cancel
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _close_buffers(converted):
+    for source in converted.values():
+        if not isinstance(source, Exception):
+            source.close()
+
+
+class _MergerOutput:
+    """Collects pages in a PdfMerger and writes the output at the end."""
+
+    bytes_saved = 0
+    # Whole PDFs are appended with append_file so their outlines are kept
+    keeps_outlines = True
+    writes_at_finish = True
+
+    def __init__(self):
+        self.merger = _new_merger()
+
+    @property
+    def page_count(self):
+        return len(self.merger.pages)
+
+    def append_file(self, path):
+        # Whole PDFs go through append() so their outlines are kept
+        self.merger.append(path)
+
+    def append_pages(self, reader, pages):
+        self.merger.append_reader(reader, pages)
+
+    def release(self, reader):
+        # PdfMerger copies pages when it writes the output, so it still needs reader's objects
+        pass
+
+    def finish(self, output_file, on_write=None):
+        # Written next to the output and renamed over it, so a failed write leaves no partial file
+        directory, name = os.path.split(os.path.abspath(output_file))
+        fd, temp_file = tempfile.mkstemp(dir=directory, prefix=name + '.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                self.merger.write(f, on_write)
+            replace_file(temp_file, output_file)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    def close(self):
+        self.merger.close()
+
+
+class _StreamingOutput:
+    """Writes pages to a temp file next to the output as they are appended.
+
+    The temp file replaces output_file once the xref table is written, so a
+    failed merge never leaves a truncated output behind.
+    """
+
+    keeps_outlines = False
+    writes_at_finish = False
+
+    def __init__(self, output_file, readers, memory_limit, dedup=False, compress=False, object_streams=False):
+        from .streaming import StreamingPdfWriter
+
+        directory, name = os.path.split(os.path.abspath(output_file))
+        fd, self.temp_file = tempfile.mkstemp(dir=directory, prefix=name + '.', suffix='.part')
+        self.file = os.fdopen(fd, 'wb')
+        self.writer = StreamingPdfWriter(self.file, memory_limit, dedup=dedup, compress=compress,
+                                         object_streams=object_streams)
+        self.readers = readers
+
+    @property
+    def page_count(self):
+        return self.writer.page_count
+
+    @property
+    def bytes_saved(self):
+        return self.writer.bytes_saved
+
+    def append_file(self, path):
+        reader = self.readers.get(path)
+        self.writer.add_pages(reader, range(len(reader.pages)))
+
+    def append_pages(self, reader, pages):
+        self.writer.add_pages(reader, pages)
+
+    def release(self, reader):
+        self.writer.release(reader)
+
+    def finish(self, output_file, on_write=None):
+        self.writer.close()
+        self.file.close()
+        replace_file(self.temp_file, output_file)
+
+    def close(self):
+        self.writer.shutdown()
+        if not self.file.closed:
+            self.file.close()
+        if os.path.exists(self.temp_file):
+            os.remove(self.temp_file)
+
+
+class _JobReaders:
+    """Parsed PDF readers for one merge; each source is parsed at most once.
+
+    With mmap_inputs=True, source files are read through a MappedFile.
+    """
+
+    def __init__(self, mmap_inputs=False):
+        self.mmap_inputs = mmap_inputs
+        self._readers = {}
+        self._opened = []
+
+    def get(self, file, stream=None):
+        """Return the reader for file, parsing stream (or the file itself) on first use."""
+        reader = self._readers.get(file)
+        if reader is None:
+            from PyPDF2 import PdfReader
+
+            with tracing.span('open', file=file) as span:
+                if stream is None:
+                    stream = self._open(file)
+                    self._opened.append(stream)
+                stream.seek(0)
+                reader = self._readers[file] = PdfReader(stream)
+                if tracing.enabled():
+                    span.set(size=stream.seek(0, os.SEEK_END), pages=len(reader.pages))
+        return reader
+
+    def _open(self, file):
+        if self.mmap_inputs:
+            from .mapped import MappedFile
+
+            try:
+                return MappedFile(file)
+            except ValueError:
+                # Empty files cannot be mapped; PdfReader will report them
+                pass
+        # An open file is read on demand; PdfReader(path) would copy it into memory
+        return open(file, 'rb')
+
+    def lock(self, file):
+        """Return the lock to hold while reading from file's reader; a single merge needs none."""
+        return _NO_LOCK
+
+    def close(self):
+        for stream in self._opened:
+            stream.close()
+        self._readers.clear()
+        self._opened.clear()
+
+
+_NO_LOCK = contextlib.nullcontext()
+
+
+class SharedReaders(_JobReaders):
+    """Parsed PDF readers shared by merges running on several threads.
+
+    A PdfReader reads its file lazily and is not thread-safe, so every
+    source has a lock, held while its reader is parsed and while pages are
+    copied from it.  merge_files(readers=...) takes the locks itself.
+    """
+
+    def __init__(self, mmap_inputs=False):
+        super().__init__(mmap_inputs)
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def lock(self, file):
+        with self._guard:
+            lock = self._locks.get(file)
+            if lock is None:
+                lock = self._locks[file] = threading.RLock()
+        return lock
+
+    def get(self, file, stream=None):
+        with self.lock(file):
+            return super().get(file, stream)
+
+    def close(self):
+        with self._guard:
+            super().close()
+            self._locks.clear()
+
+
+def _plan_entries(input_files, file_pages):
+    """Yield (path, pages) for each input.
+
+    An input is a path, whose pages come from file_pages (keyed by absolute
+    path), or a (path, pages) pair, which lets one file appear several times
+    with different page selections.
+    """
+    for entry in input_files:
+        if isinstance(entry, (tuple, list)):
+            yield entry[0], list(entry[1] or [])
+        else:
+            pages = file_pages.get(os.path.abspath(entry), []) if file_pages else []
+            yield entry, pages
+
+
+# Function to merge files into a single PDF
+def merge_files(input_files, output_file, progress_callback=None, file_pages=None, strict=False,
+                spill_threshold=DEFAULT_SPILL_THRESHOLD, workers=None, image_dpi=None, cache=None,
+                streaming=False, memory_limit=None, dedup=False, text_encoding=None, wrap_text=True, index=None,
+                on_progress=None, cancel_event=None, compress=False, object_streams=False, linearize=False,
+                readers=None, mmap_inputs=False, preflight=None):
+    """Merge input_files into the PDF output_file.
+
+    Each input is a path or a (path, pages) pair; pages are 0-based indexes
+    and an empty selection means all pages.  file_pages maps an absolute
+    path to the pages to keep for inputs given as plain paths.  Selected
+    pages are appended straight from one shared reader per source file.
+    progress_callback receives the percentage of inputs completed.  With
+    strict=True the first failing input aborts the merge.  Converted inputs
+    are kept in memory up to spill_threshold bytes each.  workers > 1
+    converts inputs on that many processes (0 means one per CPU) while
+    keeping the input order.  image_dpi downsamples images placed above that
+    resolution.  text_encoding is the encoding of TXT inputs (UTF-8 by
+    default) and wrap_text=False clips long lines instead of wrapping them.
+    cache is an optional ConversionCache consulted before converting
+    non-PDF inputs.  streaming=True writes each page to disk as it is
+    appended (see filemerger.streaming), keeping memory flat for very large
+    outputs at the cost of outlines; memory_limit bounds the source objects
+    held in memory meanwhile, and each input's objects are released once
+    its pages are written.  dedup=True stores identical fonts,
+    images and other shared objects once across all inputs; it implies
+    streaming, and MergeResult.bytes_saved reports the saving.  index is
+    an optional filemerger.index.PdfIndex; with it, encrypted PDFs and page
+    selections outside a PDF are reported before any input is converted.
+    on_progress receives a MergeProgress every PROGRESS_PAGES appended pages
+    and after each input.  Setting cancel_event (a threading.Event) stops
+    the merge at the next input or page batch with MergeCancelled; no
+    output is left behind.  compress=True deflates streams stored without
+    compression on all cores, object_streams=True packs the other objects
+    into object streams with an xref stream; both imply streaming.
+    linearize=True rewrites the output for fast web view with pikepdf or
+    qpdf, raising MergeError up front if neither is available.  readers is
+    a SharedReaders pool to parse sources once across concurrent merges; it
+    implies streaming and is left open.  mmap_inputs=True reads source PDFs
+    through memory mappings, so their stream data is copied to the output
+    without passing through the heap; it implies streaming.  preflight
+    ('abort', 'skip' or 'warn') checks every input concurrently before
+    anything is converted and acts on the problems found as described in
+    filemerger.preflight; the report is kept in MergeResult.preflight.
+    Returns a MergeResult.
+    """
+    start_time = time.time()
+    result = MergeResult(output_file)
+    entries = list(_plan_entries(input_files, file_pages))
+    rejected = {}  # entry number -> pre-flight errors, for preflight='skip'
+    if preflight is not None:
+        from .preflight import POLICIES, check_inputs, raise_for_errors
+
+        if preflight not in POLICIES:
+            raise ValueError(f"preflight must be one of {', '.join(POLICIES)}, not {preflight!r}")
+        with tracing.span('preflight', inputs=len(entries)):
+            result.preflight = check_inputs(entries, text_encoding=text_encoding, index=index)
+        if preflight == 'abort':
+            raise_for_errors(result.preflight)
+        for number, check in enumerate(result.preflight.checks):
+            for message in check.warnings if preflight == 'skip' else check.warnings + check.errors:
+                logger.warning("%s", message)
+            if check.errors and preflight == 'skip':
+                rejected[number] = check.errors
+    own_readers = readers is None
+    if own_readers:
+        readers = _JobReaders(mmap_inputs)
+    linearizer = None
+    if linearize:
+        from .linearize import find_linearizer
+
+        linearizer = find_linearizer()
+    # PdfMerger reads pages lazily while writing, which a shared reader's lock cannot cover
+    if streaming or dedup or compress or object_streams or mmap_inputs or not own_readers:
+        from .streaming import DEFAULT_MEMORY_LIMIT
+
+        try:
+            output = _StreamingOutput(output_file, readers, memory_limit or DEFAULT_MEMORY_LIMIT, dedup=dedup,
+                                      compress=compress, object_streams=object_streams)
+        except OSError as e:
+            raise MergeError(f"Cannot write to {output_file}: {e}") from e
+    else:
+        output = _MergerOutput()
+
+    logger.debug("merge_files: input_files=%s file_pages=%s", input_files, file_pages)
+
+    def fail(file, message):
+        if strict:
+            raise MergeError(message)
+        logger.info(message)
+        result.errors.append((file, message))
+
+    total_files = len(entries)
+    completed = 0
+
+    def check_cancel():
+        if cancel_event is not None and cancel_event.is_set():
+            raise MergeCancelled("Merge cancelled")
+
+    def advance():
+        nonlocal completed
+        completed += 1
+        if progress_callback:
+            progress_callback(completed / total_files * 100)
+
+    if progress_callback:
+        progress_callback(0)
+
+    items = []
+    for number, (file, pages) in enumerate(entries):
+        if number in rejected:
+            for message in rejected[number]:
+                fail(file, message)
+            advance()
+            continue
+        if not os.path.exists(file):
+            fail(file, f"File {file} does not exist")
+            advance()
+            continue
+        file = os.path.abspath(file)
+        ext = os.path.splitext(file)[1].lower()
+        if ext != '.pdf' and get_converter(file) is None:
+            fail(file, f"Skipping {file}: Unsupported file type")
+            advance()
+            continue
+        if index is not None and ext == '.pdf':
+            info = index.lookup(file)
+            if info.encrypted:
+                fail(file, f"Skipping {file}: PDF is encrypted")
+                advance()
+                continue
+            if pages and info.pages is not None and not any(0 <= p < info.pages for p in pages):
+                fail(file, f"No valid pages selected for {file}. Using all pages.")
+                pages = []
+        items.append((file, ext, pages))
+
+    options = converter_options(image_dpi, text_encoding, wrap_text)
+
+    # Converted PDFs by input path, shared by every entry of the same file
+    converted = {}
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers and workers > 1 and len({file for file, ext, _ in items if _needs_conversion(ext)}) > 1:
+        sources = _parallel_sources(items, converted, workers, spill_threshold, options, cache, advance, check_cancel)
+    else:
+        sources = _serial_sources(items, converted, spill_threshold, options, cache, advance, check_cancel)
+
+    sizes = {}
+    for file, _, _ in items:
+        try:
+            sizes[file] = os.path.getsize(file)
+        except OSError:
+            sizes[file] = 0
+    bytes_total = write_total = sum(sizes[file] for file, _, _ in items)
+    if output.writes_at_finish:
+        bytes_total += write_total
+    files_done = bytes_done = 0
+    progress_start = time.monotonic()
+
+    def report(stage, file=None, partial=0):
+        if on_progress is not None:
+            on_progress(MergeProgress(stage, file, files_done, len(items), output.page_count, bytes_done + partial,
+                                      bytes_total, time.monotonic() - progress_start))
+
+    with tracing.span('merge', output=output_file, inputs=total_files):
+        try:
+            for (file, ext, pages), source in sources:
+                check_cancel()
+                if isinstance(source, ConversionError):
+                    fail(file, str(source))
+                elif isinstance(source, str) and not pages and output.keeps_outlines:
+                    try:
+                        with tracing.span('append', file=file):
+                            output.append_file(source)
+                    except Exception as e:
+                        fail(file, f"Failed to append {file}: {e}")
+                else:
+                    try:
+                        with readers.lock(file):
+                            reader = readers.get(file, None if isinstance(source, str) else source)
+                            total_pages = len(reader.pages)
+                        selected = [p for p in pages if 0 <= p < total_pages]
+                        if not selected:
+                            if pages:
+                                fail(file, f"No valid pages selected for {file}. Using all pages.")
+                            selected = range(total_pages)
+                        with tracing.span('extract' if pages else 'append', file=file, pages=len(selected)):
+                            for start in range(0, len(selected), PROGRESS_PAGES):
+                                check_cancel()
+                                batch = selected[start:start + PROGRESS_PAGES]
+                                with readers.lock(file):
+                                    output.append_pages(reader, batch)
+                                report('merge', file, sizes[file] * (start + len(batch)) // len(selected))
+                        # Done with this input: give back what was cached from it, so memory_limit
+                        # bounds the whole merge rather than each input separately
+                        with readers.lock(file):
+                            output.release(reader)
+                    except MergeError:
+                        raise
+                    except Exception as e:
+                        fail(file, f"Failed to append {file}: {e}")
+                files_done += 1
+                bytes_done += sizes[file]
+                report('merge', file)
+
+            if not output.page_count:
+                raise MergeError("No pages were merged. Check your input files.", errors=result.errors)
+
+            check_cancel()
+            report('write')
+
+            def on_write(count):
+                if count % PROGRESS_PAGES == 0:
+                    check_cancel()
+                    report('write', partial=write_total * count // output.page_count)
+
+            try:
+                with tracing.span('write', output=output_file, pages=output.page_count) as span:
+                    output.finish(output_file, on_write if output.writes_at_finish else None)
+                    if linearizer is not None:
+                        with tracing.span('linearize', output=output_file):
+                            linearizer(output_file)
+                    if tracing.enabled() and isinstance(output_file, str):
+                        span.set(size=os.path.getsize(output_file))
+            except MergeError:
+                raise
+            except PermissionError as e:
+                raise MergeError(
+                    f"Cannot write to {output_file}. Ensure it's not open and you have permissions.") from e
+            except Exception as e:
+                raise MergeError(f"Error merging files: {e}") from e
+            result.page_count = output.page_count
+            result.bytes_saved = output.bytes_saved
+            bytes_done = bytes_total
+            report('done')
+        finally:
+            with tracing.span('cleanup'):
+                sources.close()
+                output.close()
+                if own_readers:
+                    readers.close()
+                _close_buffers(converted)
+
+    result.elapsed = time.time() - start_time
+    logger.info("Merged %d pages into %s in %.2fs", result.page_count, output_file, result.elapsed)
+    return result
@@ -0,0 +1,29 @@
+"""Exceptions raised by the FileMerger engine."""
+
+
+class MergeError(Exception):
+    """A merge could not produce an output file.
+
+    errors lists the (input file, message) problems collected before the
+    merge gave up, when there were any.
+    """
+
+    def __init__(self, message='', errors=None):
+        super().__init__(message)
+        self.errors = list(errors or [])
+
+
+class ConversionError(MergeError):
+    """A single input could not be converted to PDF."""
+
+
+class MergeCancelled(MergeError):
+    """The merge was stopped through its cancel event."""
+
+
+class PreflightError(MergeError):
+    """Pre-flight checks found inputs that cannot be merged; report has the details."""
+
+    def __init__(self, message, report=None):
+        super().__init__(message)
+        self.report = report
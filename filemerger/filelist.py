@@ -0,0 +1,108 @@
+"""Ordered list of merge inputs, sized for tens of thousands of entries.
+
+The GUI keeps its inputs in a FileList: parallel lists of paths and page
+selections plus a count of each path, so checking whether a dropped file is
+already listed does not scan the list.  A path may still appear more than
+once when an entry is duplicated to take another page range from it.
+"""
+import os
+
+
+class FileList:
+    """Entries of (absolute path, pages), in merge order."""
+
+    def __init__(self):
+        self.paths = []
+        self.pages = []
+        self._counts = {}
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        return zip(self.paths, self.pages)
+
+    def __contains__(self, path):
+        return os.path.abspath(path) in self._counts
+
+    def __getitem__(self, index):
+        return self.paths[index], self.pages[index]
+
+    def entries(self):
+        """Return [(path, pages)] for merge_files."""
+        return list(zip(self.paths, self.pages))
+
+    def add(self, paths):
+        """Append the paths that are not listed yet; return the ones added."""
+        added = []
+        for path in paths:
+            path = os.path.abspath(path)
+            if path in self._counts:
+                continue
+            self._counts[path] = 1
+            added.append(path)
+        self.paths.extend(added)
+        self.pages.extend([] for _ in added)
+        return added
+
+    def duplicate(self, index):
+        """Insert a copy of entry index right after it; return the new index."""
+        path = self.paths[index]
+        self.paths.insert(index + 1, path)
+        self.pages.insert(index + 1, list(self.pages[index]))
+        self._counts[path] += 1
+        return index + 1
+
+    def remove(self, indexes):
+        """Remove the entries at indexes in a single pass."""
+        indexes = set(indexes)
+        if not indexes:
+            return
+        for index in indexes:
+            path = self.paths[index]
+            if self._counts[path] == 1:
+                del self._counts[path]
+            else:
+                self._counts[path] -= 1
+        keep = [i for i in range(len(self.paths)) if i not in indexes]
+        self.paths = [self.paths[i] for i in keep]
+        self.pages = [self.pages[i] for i in keep]
+
+    def move(self, index, offset):
+        """Swap entry index with its neighbour offset (-1 or 1) away; return its new index or None."""
+        target = index + offset
+        if not 0 <= target < len(self.paths):
+            return None
+        self.paths[index], self.paths[target] = self.paths[target], self.paths[index]
+        self.pages[index], self.pages[target] = self.pages[target], self.pages[index]
+        return target
+
+    def set_pages(self, index, pages):
+        self.pages[index] = list(pages)
+
+
+def scan_folder(directory, extensions):
+    """Yield files under directory with one of extensions, depth first in name order.
+
+    Uses os.scandir, so file types come from the directory listing rather
+    than a stat() per entry.  Symlinked directories are not followed.
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    stack = [os.path.abspath(directory)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = sorted(it, key=lambda entry: entry.name.lower())
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.name.lower().endswith(extensions) and entry.is_file():
+                    yield entry.path
+            except OSError:
+                continue
+        # Reversed so the stack pops them in name order
+        stack.extend(reversed(subdirectories))
@@ -0,0 +1,213 @@
+"""Page counts and encryption status of PDF inputs, read in the background.
+
+read_pdf_info() answers from the end of the file: it reads the trailer, then
+only the xref entries and objects on the path /Root -> /Pages -> /Count,
+seeking straight to each 20-byte xref entry instead of parsing the whole
+table.  Files it cannot handle that way (xref streams, an indirect /Count)
+are opened with PyPDF2, which still reads /Count from the page tree root
+rather than flattening every page.
+
+PdfIndex caches the results by path, mtime and size, and fills itself on a
+small thread pool so the GUI can ask for page counts as soon as files are
+added.  merge_files(index=...) reuses the same entries to check page
+selections before any conversion starts.
+"""
+import collections
+import concurrent.futures
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+PdfInfo = collections.namedtuple('PdfInfo', 'pages encrypted size error')
+
+_TAIL_BYTES = 2048
+_OBJECT_BYTES = 4096
+# A page tree root lists every kid, so it may need more than one read
+_MAX_OBJECT_BYTES = 4 * 1024 * 1024
+_XREF_ENTRY = 20
+# Incremental updates followed before giving up on the raw reader
+_MAX_SECTIONS = 32
+
+_STARTXREF = re.compile(rb'startxref\s+(\d+)')
+_SUBSECTION = re.compile(rb'\s*(\d+)\s+(\d+)\s*')
+_ROOT = re.compile(rb'/Root\s+(\d+)\s+(\d+)\s+R')
+_PREV = re.compile(rb'/Prev\s+(\d+)')
+_PAGES = re.compile(rb'/Pages\s+(\d+)\s+(\d+)\s+R')
+# A direct count only: "/Count 15 0 R" must not match as /Count 1
+_COUNT = re.compile(rb'/Count\s+(\d+)(?![\d\s]*R)')
+
+
+class _Unsupported(Exception):
+    """The raw reader cannot answer for this file; use PyPDF2."""
+
+
+def _xref_sections(f, offset):
+    """Yield (subsections, trailer) for the classic xref table at offset and its /Prev chain."""
+    for _ in range(_MAX_SECTIONS):
+        f.seek(offset)
+        if f.read(4) != b'xref':
+            raise _Unsupported("not a classic xref table")
+        subsections = []
+        position = offset + 4
+        while True:
+            f.seek(position)
+            line = f.read(64)
+            if line.lstrip().startswith(b'trailer'):
+                break
+            match = _SUBSECTION.match(line)
+            if not match:
+                raise _Unsupported("malformed xref subsection")
+            start, count = int(match.group(1)), int(match.group(2))
+            entries = position + match.end()
+            subsections.append((start, count, entries))
+            position = entries + count * _XREF_ENTRY
+        f.seek(position)
+        trailer = f.read(_OBJECT_BYTES)
+        trailer = trailer[:trailer.find(b'startxref')] if b'startxref' in trailer else trailer
+        yield subsections, trailer
+        prev = _PREV.search(trailer)
+        if prev is None:
+            return
+        offset = int(prev.group(1))
+    raise _Unsupported("too many incremental updates")
+
+
+def _read_object(f, sections, number):
+    """Return the start of object number's body, using the newest xref entry for it."""
+    for subsections, _ in sections:
+        for start, count, entries in subsections:
+            if start <= number < start + count:
+                f.seek(entries + (number - start) * _XREF_ENTRY)
+                fields = f.read(_XREF_ENTRY).split()
+                if len(fields) < 3 or fields[2] != b'n':
+                    raise _Unsupported(f"object {number} is not in use")
+                f.seek(int(fields[0]))
+                data = f.read(_OBJECT_BYTES)
+                if not data.lstrip().startswith(b'%d ' % number):
+                    raise _Unsupported(f"xref offset of object {number} is wrong")
+                end = data.find(b'endobj')
+                if end < 0:
+                    data = bytearray(data)
+                    while end < 0 and len(data) < _MAX_OBJECT_BYTES:
+                        chunk = f.read(len(data))
+                        if not chunk:
+                            break
+                        data += chunk
+                        end = data.find(b'endobj', len(data) - len(chunk) - 6)
+                return bytes(data if end < 0 else data[:end])
+    raise _Unsupported(f"object {number} is not in the xref table")
+
+
+def _raw_info(f, size):
+    f.seek(max(0, size - _TAIL_BYTES))
+    starts = _STARTXREF.findall(f.read())
+    if not starts:
+        raise _Unsupported("no startxref")
+    sections = list(_xref_sections(f, int(starts[-1])))
+    trailer = sections[0][1]
+    encrypted = b'/Encrypt' in trailer
+    root = _ROOT.search(trailer)
+    if root is None:
+        raise _Unsupported("trailer has no /Root")
+    pages = _PAGES.search(_read_object(f, sections, int(root.group(1))))
+    if pages is None:
+        raise _Unsupported("catalog has no /Pages")
+    count = _COUNT.search(_read_object(f, sections, int(pages.group(1))))
+    if count is None:
+        raise _Unsupported("page tree root has no direct /Count")
+    return int(count.group(1)), encrypted
+
+
+def _pypdf2_info(f):
+    from PyPDF2 import PdfReader
+
+    f.seek(0)
+    reader = PdfReader(f)
+    return int(reader.trailer['/Root']['/Pages']['/Count']), reader.is_encrypted
+
+
+def read_pdf_info(path):
+    """Return the PdfInfo of the PDF at path; problems are reported in its error field."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            try:
+                pages, encrypted = _raw_info(f, size)
+            except (_Unsupported, ValueError) as e:
+                logger.debug("%s: %s; reading with PyPDF2", path, e)
+                pages, encrypted = _pypdf2_info(f)
+    except Exception as e:
+        return PdfInfo(None, False, None, f"Cannot read {path}: {e}")
+    return PdfInfo(pages, encrypted, size, None)
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PdfIndex:
+    """PdfInfo of PDF files by path, kept fresh by mtime and size."""
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self._entries = {}  # path -> (signature, PdfInfo)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path):
+        """Return the cached PdfInfo for path, or None if it is unknown or stale."""
+        path = os.path.abspath(path)
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != _signature(path):
+            return None
+        return entry[1]
+
+    def lookup(self, path):
+        """Return the PdfInfo for path, reading the file now if the cache cannot answer."""
+        info = self.get(path)
+        if info is None:
+            info = self._read(os.path.abspath(path))
+        return info
+
+    def _read(self, path):
+        signature = _signature(path)
+        info = read_pdf_info(path)
+        with self._lock:
+            self._pending.discard(path)
+            if signature is not None and info.error is None:
+                self._entries[path] = (signature, info)
+        return info
+
+    def request(self, paths):
+        """Read the PDFs among paths that are not cached yet on the background threads."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers,
+                                                                       thread_name_prefix='pdf-index')
+            for path in paths:
+                path = os.path.abspath(path)
+                if not path.lower().endswith('.pdf') or path in self._pending or self.get(path) is not None:
+                    continue
+                self._pending.add(path)
+                self._executor.submit(self._read, path)
+
+    def pending(self):
+        return len(self._pending)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
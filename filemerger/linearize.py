@@ -0,0 +1,53 @@
+"""Linearized ("fast web view") output.
+
+A linearized PDF starts with the first page and a hint table, so a viewer
+reading it over a slow link can show page one before the rest arrives.
+Writing one means reordering the whole file, which is left to qpdf: through
+pikepdf when it is installed, otherwise the qpdf command line tool.
+"""
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from .engine import replace_file
+from .errors import MergeError
+
+logger = logging.getLogger(__name__)
+
+
+def find_linearizer():
+    """Return a function that linearizes a PDF in place; MergeError if neither pikepdf nor qpdf exist."""
+    try:
+        import pikepdf
+    except ImportError:
+        pikepdf = None
+    if pikepdf is not None:
+        def run(source, target):
+            with pikepdf.open(source) as pdf:
+                pdf.save(target, linearize=True, object_stream_mode=pikepdf.ObjectStreamMode.preserve)
+    else:
+        qpdf = shutil.which('qpdf')
+        if qpdf is None:
+            raise MergeError("Linearized output needs the pikepdf package or the qpdf command")
+
+        def run(source, target):
+            completed = subprocess.run([qpdf, '--linearize', '--object-streams=preserve', source, target],
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            # Exit status 3 means qpdf wrote the file but warned about the input
+            if completed.returncode not in (0, 3):
+                raise MergeError(f"qpdf failed: {completed.stderr.strip()}")
+
+    def linearize(path):
+        directory, name = os.path.split(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=name + '.', suffix='.part')
+        os.close(fd)
+        try:
+            run(path, temp_path)
+            replace_file(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        logger.debug("Linearized %s", path)
+    return linearize
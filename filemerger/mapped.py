@@ -0,0 +1,76 @@
+"""Read-only memory-mapped source files for PdfReader.
+
+PdfReader reads the data of a stream object with one read() of its /Length
+and keeps the result in its object cache.  Over a MappedFile such a read
+returns a view of the mapping instead of a copy, so the image data of a
+scanned page never lands on the heap: the streaming writer hands the view,
+still compressed, straight to the output file.  The mapped pages are clean
+file pages the kernel can reclaim under memory pressure, and release()
+drops them from the resident set once the writer has released the objects
+it cached from the file.
+"""
+import mmap
+import os
+
+# Reads at least this long return a view of the mapping instead of a copy
+ZERO_COPY_BYTES = 64 * 1024
+
+
+class MappedFile:
+    """Binary file-like object reading path through a read-only mapping."""
+
+    mode = 'rb'
+
+    def __init__(self, path):
+        # Raises ValueError for an empty file, which cannot be mapped
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._position = 0
+        self.name = path
+
+    @property
+    def closed(self):
+        return self._map.closed
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += len(self._map)
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def read(self, size=-1):
+        start = self._position
+        end = len(self._map) if size is None or size < 0 else min(len(self._map), start + size)
+        if end <= start:
+            return b""
+        self._position = end
+        if size is not None and size >= ZERO_COPY_BYTES:
+            return self._view[start:end]
+        return self._map[start:end]
+
+    def release(self):
+        """Drop the mapped pages from the resident set; they are read back from the file if used again."""
+        if hasattr(mmap, 'MADV_DONTNEED') and not self._map.closed:
+            self._map.madvise(mmap.MADV_DONTNEED)
+
+    def close(self):
+        try:
+            self._view.release()
+            self._map.close()
+        except BufferError:
+            # Stream data still in use keeps the mapping alive until the last view is gone
+            pass
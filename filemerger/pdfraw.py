@@ -0,0 +1,131 @@
+"""Minimal PDF serializer for converters that build pages directly.
+
+The converters only need a handful of fixed object layouts, so writing the
+objects ourselves avoids going through reportlab and lets image and text data
+be embedded without re-encoding.
+
+With object_streams=True, objects other than streams are packed into
+compressed object streams and the cross-reference table is written as a
+compressed xref stream (PDF 1.5), which makes files with many small page
+and resource dictionaries noticeably smaller.
+"""
+import zlib
+
+PDF_HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+# Objects packed into each object stream
+OBJECTS_PER_STREAM = 200
+
+
+def pdf_string(text):
+    """Encode text as a PDF literal string (latin-1, escaped)."""
+    data = text.encode('latin-1', 'replace') if isinstance(text, str) else text
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class RawPdfWriter:
+    """Write numbered objects to a binary file and finish with xref/trailer.
+
+    Object numbers come from reserve(); objects may be written in any order.
+    Offsets are tracked from the bytes written, so the target does not need
+    to be seekable.  object_streams=True needs a PDF 1.5 or later header.
+    """
+
+    def __init__(self, fileobj, header=PDF_HEADER, object_streams=False):
+        self.fileobj = fileobj
+        self.offsets = {}
+        self.next_id = 1
+        self.position = 0
+        self.object_streams = object_streams
+        self.packed = {}  # obj_id -> (object stream id, index) for objects in object streams
+        self._unpacked = []  # (obj_id, body) waiting for the next object stream
+        self._write(header)
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self.position += len(data)
+
+    def reserve(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def write_object(self, obj_id, body):
+        """Write obj_id with the serialized body (bytes)."""
+        if self.object_streams:
+            self._unpacked.append((obj_id, body))
+            if len(self._unpacked) >= OBJECTS_PER_STREAM:
+                self._write_object_stream()
+            return
+        self.offsets[obj_id] = self.position
+        self._write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    def write_stream(self, obj_id, entries, data):
+        """Write a stream object; entries is the dictionary content without << >> or /Length."""
+        self.offsets[obj_id] = self.position
+        self._write(b"%d 0 obj\n<< %s /Length %d >>\nstream\n" % (obj_id, entries, len(data)))
+        self._write(data)
+        self._write(b"\nendstream\nendobj\n")
+
+    def _write_object_stream(self):
+        stream_id = self.reserve()
+        header = []
+        bodies = []
+        offset = 0
+        for index, (obj_id, body) in enumerate(self._unpacked):
+            self.packed[obj_id] = (stream_id, index)
+            header.append(b"%d %d" % (obj_id, offset))
+            bodies.append(body + b"\n")
+            offset += len(body) + 1
+        header = b" ".join(header) + b"\n"
+        data = zlib.compress(header + b"".join(bodies))
+        self.write_stream(stream_id, b"/Type /ObjStm /N %d /First %d /Filter /FlateDecode" % (
+            len(self._unpacked), len(header)), data)
+        self._unpacked = []
+
+    def _close_with_xref_stream(self, root_id):
+        if self._unpacked:
+            self._write_object_stream()
+        xref_id = self.reserve()
+        xref_offset = self.position
+        self.offsets[xref_id] = xref_offset
+        size = self.next_id
+        width = max(4, (xref_offset.bit_length() + 7) // 8)
+        # Entries: type 0 (free), 1 (byte offset) or 2 (object stream and index), with 1, width and 2 byte fields
+        compressor = zlib.compressobj()
+        chunks = []
+        for first in range(0, size, 4096):
+            entries = bytearray()
+            for obj_id in range(first, min(first + 4096, size)):
+                offset = self.offsets.get(obj_id)
+                if offset is not None:
+                    entries += b"\x01" + offset.to_bytes(width, 'big') + b"\x00\x00"
+                elif obj_id in self.packed:
+                    stream_id, index = self.packed[obj_id]
+                    entries += b"\x02" + stream_id.to_bytes(width, 'big') + index.to_bytes(2, 'big')
+                else:
+                    entries += b"\x00" + bytes(width) + (b"\xff\xff" if obj_id == 0 else b"\x00\x00")
+            chunks.append(compressor.compress(bytes(entries)))
+        chunks.append(compressor.flush())
+        self.write_stream(xref_id, b"/Type /XRef /Size %d /W [1 %d 2] /Root %d 0 R /Filter /FlateDecode" % (
+            size, width, root_id), b"".join(chunks))
+        self._write(b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+
+    def close(self, root_id):
+        """Write the cross-reference table and trailer."""
+        if self.object_streams:
+            self._close_with_xref_stream(root_id)
+            return
+        xref_offset = self.position
+        size = self.next_id
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        # Written in slices so a document with millions of objects does not build the table in memory
+        for first in range(1, size, 4096):
+            lines = []
+            for obj_id in range(first, min(first + 4096, size)):
+                offset = self.offsets.get(obj_id)
+                if offset is None:
+                    lines.append(b"0000000000 65535 f \n")
+                else:
+                    lines.append(b"%010d 00000 n \n" % offset)
+            self._write(b"".join(lines))
+        self._write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, root_id, xref_offset))
@@ -0,0 +1,218 @@
+"""Pre-flight checks of merge inputs, run before anything is converted.
+
+merge_files() finds a bad input only when it gets to it, possibly after
+minutes spent converting the inputs before it.  check_inputs() probes every
+input up front, on a pool of threads, with checks that read little more
+than file headers:
+
+- the file exists and there is a converter for its format;
+- a PDF starts with %PDF-, its trailer and page tree can be read, it is not
+  encrypted (see filemerger.index), and its page selection is in range;
+- Pillow can parse an image's header;
+- a TXT file decodes in the text encoding, read in chunks;
+- a DOCX file is a Word package, and something can convert it.
+
+merge_files(preflight=...) acts on the PreflightReport by policy: 'abort'
+raises PreflightError if any input has an error, 'skip' leaves those inputs
+out and reports them in MergeResult.errors, and 'warn' logs the problems and
+merges everything as before.
+"""
+import concurrent.futures
+import logging
+import os
+import time
+
+from .errors import PreflightError
+from .index import read_pdf_info
+from .registry import get_converter
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('abort', 'skip', 'warn')
+# Problems listed in a PreflightError message
+MAX_LISTED_PROBLEMS = 10
+_HEADER_BYTES = 1024
+_TEXT_CHUNK = 1024 * 1024
+
+
+class InputCheck:
+    """Findings for one input.  Errors stop it from merging; warnings do not."""
+
+    def __init__(self, file, pages):
+        self.file = file
+        self.pages = pages
+        self.kind = None
+        self.page_count = None
+        self.errors = []
+        self.warnings = []
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def to_dict(self):
+        return {'file': self.file, 'kind': self.kind, 'page_count': self.page_count, 'pages': self.pages,
+                'errors': self.errors, 'warnings': self.warnings}
+
+
+class PreflightReport:
+    """InputChecks in input order, plus how long the checks took."""
+
+    def __init__(self, checks, elapsed):
+        self.checks = checks
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return all(check.ok for check in self.checks)
+
+    @property
+    def errors(self):
+        """[(input file, message)] of every error."""
+        return [(check.file, message) for check in self.checks for message in check.errors]
+
+    @property
+    def warnings(self):
+        return [(check.file, message) for check in self.checks for message in check.warnings]
+
+    def to_dict(self):
+        return {'ok': self.ok, 'elapsed': self.elapsed, 'inputs': [check.to_dict() for check in self.checks]}
+
+    def __repr__(self):
+        return (f"PreflightReport(inputs={len(self.checks)}, errors={len(self.errors)}, "
+                f"warnings={len(self.warnings)}, elapsed={self.elapsed:.2f})")
+
+
+def _check_pdf(check, index):
+    with open(check.file, 'rb') as f:
+        if b'%PDF-' not in f.read(_HEADER_BYTES):
+            check.errors.append(f"{check.file} is not a PDF file")
+            return
+    info = index.lookup(check.file) if index is not None else read_pdf_info(check.file)
+    if info.error is not None:
+        check.errors.append(info.error)
+    elif info.encrypted:
+        check.errors.append(f"Skipping {check.file}: PDF is encrypted")
+    else:
+        check.page_count = info.pages
+
+
+def _check_image(check):
+    from PIL import Image
+
+    try:
+        # Image.open only parses the header; pixel data is read on load()
+        Image.open(check.file).close()
+    except Exception as e:
+        check.errors.append(f"Cannot read image {check.file}: {e}")
+
+
+def _check_text(check, encoding):
+    import codecs
+
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)()
+    except LookupError:
+        check.errors.append(f"Cannot read {check.file}: unknown text encoding {encoding}")
+        return
+    offset = 0
+    with open(check.file, 'rb') as f:
+        while True:
+            chunk = f.read(_TEXT_CHUNK)
+            try:
+                decoder.decode(chunk, not chunk)
+            except UnicodeDecodeError as e:
+                check.warnings.append(f"{check.file} is not valid {encoding} near byte {offset + e.start}; "
+                                      f"characters that do not decode will be replaced")
+                return
+            if not chunk:
+                return
+            offset += len(chunk)
+
+
+def _check_docx(check):
+    import zipfile
+
+    from .converters import docx_supported
+
+    try:
+        with zipfile.ZipFile(check.file) as package:
+            package.getinfo('word/document.xml')
+    except (zipfile.BadZipFile, KeyError):
+        check.errors.append(f"{check.file} is not a Word document")
+        return
+    if not docx_supported():
+        check.errors.append(f"Cannot convert {check.file}: DOCX needs Microsoft Word or FILEMERGER_DOCX_COMMAND")
+
+
+def _check_file(file, text_encoding, index):
+    """Return an InputCheck of file, without looking at any page selection."""
+    check = InputCheck(file, [])
+    if not os.path.isfile(file):
+        check.errors.append(f"File {file} does not exist")
+        return check
+    ext = os.path.splitext(file)[1].lower()
+    converter = None if ext == '.pdf' else get_converter(file)
+    if ext != '.pdf' and converter is None:
+        check.errors.append(f"Skipping {file}: Unsupported file type")
+        return check
+    check.kind = 'pdf' if converter is None else converter.name
+    try:
+        if converter is None:
+            _check_pdf(check, index)
+        elif converter.name == 'image_to_pdf':
+            _check_image(check)
+        elif converter.name == 'txt_to_pdf':
+            _check_text(check, text_encoding or 'utf-8')
+        elif converter.name == 'docx_to_pdf':
+            _check_docx(check)
+    except OSError as e:
+        check.errors.append(f"Cannot read {file}: {e}")
+    return check
+
+
+def _check_pages(found, pages):
+    """Return the InputCheck of one entry: the file's findings plus its page selection."""
+    check = InputCheck(found.file, pages)
+    check.kind = found.kind
+    check.page_count = found.page_count
+    check.errors = list(found.errors)
+    check.warnings = list(found.warnings)
+    if pages and check.page_count is not None:
+        outside = [page + 1 for page in pages if not 0 <= page < check.page_count]
+        if len(outside) == len(pages):
+            check.errors.append(f"No valid pages selected for {check.file}: it has {check.page_count} pages")
+        elif outside:
+            check.warnings.append(f"{check.file} has {check.page_count} pages; "
+                                  f"page(s) {', '.join(map(str, outside[:5]))} will be left out")
+    return check
+
+
+def check_inputs(entries, workers=None, text_encoding=None, index=None):
+    """Check [(path, pages)] entries concurrently; return a PreflightReport.
+
+    Each file is probed once however many entries use it.  index is an
+    optional filemerger.index.PdfIndex to read PDF page counts from.
+    """
+    start = time.monotonic()
+    files = list(dict.fromkeys(os.path.abspath(file) for file, _ in entries))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='preflight') as executor:
+        found = dict(zip(files, executor.map(lambda file: _check_file(file, text_encoding, index), files)))
+    checks = [_check_pages(found[os.path.abspath(file)], list(pages)) for file, pages in entries]
+    report = PreflightReport(checks, time.monotonic() - start)
+    logger.info("Pre-flight checked %d inputs in %.2fs: %d errors, %d warnings", len(files), report.elapsed,
+                len(report.errors), len(report.warnings))
+    return report
+
+
+def raise_for_errors(report):
+    """Raise PreflightError listing the report's errors, if it has any."""
+    errors = report.errors
+    if not errors:
+        return
+    failed = sum(not check.ok for check in report.checks)
+    lines = [f"Pre-flight checks failed for {failed} of {len(report.checks)} inputs:"]
+    lines.extend(f"  {message}" for _, message in errors[:MAX_LISTED_PROBLEMS])
+    if len(errors) > MAX_LISTED_PROBLEMS:
+        lines.append(f"  ... and {len(errors) - MAX_LISTED_PROBLEMS} more")
+    raise PreflightError("\n".join(lines), report)
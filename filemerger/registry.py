@@ -0,0 +1,71 @@
+"""Registry of converters from input formats to PDF.
+
+Converters are looked up by file extension first and by MIME type (as
+guessed from the file name) second.  The built-in converters register
+themselves when filemerger.converters is imported; other code can add or
+replace converters with register_converter().  Worker processes only see
+converters registered at import time of the modules they load.
+"""
+import mimetypes
+import os
+
+
+class Converter:
+    """A callable ``func(input_path, output, **options)`` plus its metadata.
+
+    version is part of the conversion cache key; bump it whenever the
+    converter's output changes.
+    """
+
+    def __init__(self, name, func, extensions=(), mime_types=(), version=1):
+        self.name = name
+        self.func = func
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.mime_types = tuple(mime_types)
+        self.version = version
+
+    def __call__(self, input_path, output, **options):
+        return self.func(input_path, output, **options)
+
+    def __repr__(self):
+        return f"Converter({self.name!r}, extensions={self.extensions}, version={self.version})"
+
+
+_by_extension = {}
+_by_mime_type = {}
+
+
+def register_converter(func, extensions=(), mime_types=(), version=1, name=None):
+    """Register func for the given extensions and MIME types; returns the Converter."""
+    converter = Converter(name or func.__name__, func, extensions, mime_types, version)
+    for ext in converter.extensions:
+        _by_extension[ext] = converter
+    for mime_type in converter.mime_types:
+        _by_mime_type[mime_type] = converter
+    return converter
+
+
+def unregister_converter(converter):
+    for table in (_by_extension, _by_mime_type):
+        for key in [key for key, value in table.items() if value is converter]:
+            del table[key]
+
+
+def get_converter(path, mime_type=None):
+    """Return the Converter for path, or None if the format is not supported."""
+    _load_builtin_converters()
+    converter = _by_extension.get(os.path.splitext(path)[1].lower())
+    if converter is None:
+        mime_type = mime_type or mimetypes.guess_type(path)[0]
+        converter = _by_mime_type.get(mime_type)
+    return converter
+
+
+def supported_extensions():
+    _load_builtin_converters()
+    return tuple(_by_extension)
+
+
+def _load_builtin_converters():
+    # The built-in converters register themselves on import
+    from . import converters  # noqa: F401
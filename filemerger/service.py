@@ -0,0 +1,315 @@
+"""Local merge daemon: ``python -m filemerger serve``.
+
+The service speaks a small JSON-over-HTTP protocol on localhost TCP or on a
+Unix socket:
+
+    POST   /jobs        submit {"inputs": [...], "output": "out.pdf"}; 202 with the job
+    GET    /jobs/<id>   status and, once finished, the result or error
+    DELETE /jobs/<id>   cancel a job that has not started
+    GET    /status      queue depth, running jobs and cache statistics
+
+An input is a path or a [path, pages] pair, where pages is a list of 0-based
+page indexes or a page-range string such as "1,3-5"; "file_pages" may map
+paths to page lists as in merge_files().  "strict", "image_dpi", "streaming",
+"dedup", "compress", "object_streams", "linearize", "mmap_inputs" and
+"preflight" are passed through.  Clients name themselves with the
+X-Client-Id header (the peer address is used otherwise).
+
+Jobs wait in one queue per client and are started round-robin across
+clients, at most `concurrency` at a time, so one busy client cannot starve
+the others.  A submission that would exceed max_queued jobs in total, or
+max_per_client for its client, is refused with 429 and Retry-After.  Merges
+run in this process, so imported libraries, the conversion cache and the
+DOCX worker pool stay warm between jobs.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import itertools
+import json
+import logging
+import time
+
+from .engine import merge_files, parse_page_ranges
+from .errors import MergeError
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST_BYTES = 1024 * 1024
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            409: "Conflict", 413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error"}
+_PASSTHROUGH_OPTIONS = ('strict', 'image_dpi', 'streaming', 'dedup', 'compress', 'object_streams', 'linearize',
+                        'mmap_inputs', 'preflight')
+
+
+class ServiceBusy(MergeError):
+    """The queue is full; the client should retry later."""
+
+
+class Job:
+    def __init__(self, job_id, client, inputs, output, options):
+        self.id = job_id
+        self.client = client
+        self.inputs = inputs
+        self.output = output
+        self.options = options
+        self.status = 'queued'
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+
+    def to_dict(self):
+        info = {'id': self.id, 'client': self.client, 'status': self.status, 'output': self.output,
+                'submitted': self.submitted, 'started': self.started, 'finished': self.finished}
+        if self.result is not None:
+            info['result'] = {'page_count': self.result.page_count, 'elapsed': self.result.elapsed,
+                              'errors': [{'file': file, 'message': message} for file, message in self.result.errors]}
+        if self.error is not None:
+            info['error'] = self.error
+        return info
+
+
+def parse_job_request(request):
+    """Validate a submitted job; return (inputs, output, options) for merge_files."""
+    if not isinstance(request, dict):
+        raise ValueError("request body must be a JSON object")
+    output = request.get('output')
+    if not isinstance(output, str) or not output:
+        raise ValueError("'output' must be a path")
+    raw_inputs = request.get('inputs')
+    if not isinstance(raw_inputs, list) or not raw_inputs:
+        raise ValueError("'inputs' must be a non-empty list")
+    file_pages = request.get('file_pages') or {}
+    if not isinstance(file_pages, dict):
+        raise ValueError("'file_pages' must map paths to page lists")
+    inputs = []
+    for entry in raw_inputs:
+        if isinstance(entry, str):
+            path, pages = entry, file_pages.get(entry, [])
+        elif isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str):
+            path, pages = entry
+        else:
+            raise ValueError(f"invalid input {entry!r}; expected a path or [path, pages]")
+        if isinstance(pages, str):
+            pages = parse_page_ranges(pages)
+        elif not (isinstance(pages, list) and all(isinstance(page, int) for page in pages)):
+            raise ValueError(f"invalid pages for {path}: {pages!r}")
+        inputs.append((path, pages))
+    options = {name: request[name] for name in _PASSTHROUGH_OPTIONS if name in request}
+    return inputs, output, options
+
+
+class MergeService:
+    """Queue of merge jobs served round-robin per client with bounded concurrency."""
+
+    def __init__(self, concurrency=2, max_queued=100, max_per_client=20, cache=None, keep_finished=1000,
+                 retry_after=5):
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.max_per_client = max_per_client
+        self.cache = cache
+        self.keep_finished = keep_finished
+        self.retry_after = retry_after
+        self.jobs = {}
+        self._queues = collections.OrderedDict()  # client -> deque of queued jobs
+        self._queued = 0
+        self._running = 0
+        self._finished = collections.deque()
+        self._ids = itertools.count(1)
+        self._available = None
+        self._executor = None
+        self._workers = []
+        self._server = None
+
+    # Queue
+
+    def submit(self, client, inputs, output, options=None):
+        """Queue a job and return it; raises ServiceBusy when the queue is full."""
+        queue = self._queues.get(client)
+        if self._queued >= self.max_queued:
+            raise ServiceBusy(f"{self._queued} jobs are already queued")
+        if queue is not None and len(queue) >= self.max_per_client:
+            raise ServiceBusy(f"client {client} already has {len(queue)} jobs queued")
+        job = Job(str(next(self._ids)), client, inputs, output, options or {})
+        self.jobs[job.id] = job
+        if queue is None:
+            queue = self._queues[client] = collections.deque()
+        queue.append(job)
+        self._queued += 1
+        self._available.release()
+        logger.info("Queued job %s for %s (%d queued)", job.id, client, self._queued)
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued job; return False if it has already started."""
+        job = self.jobs[job_id]
+        if job.status != 'queued':
+            return False
+        self._queues[job.client].remove(job)
+        self._queued -= 1
+        self._finish(job, 'cancelled')
+        return True
+
+    def _next_job(self):
+        """Pop the next job, taking one from each client in turn.
+
+        A client whose queue runs empty keeps its place at the back until
+        the next pass, so submitting again does not let it jump the clients
+        still waiting.
+        """
+        for client, queue in list(self._queues.items()):
+            if not queue:
+                del self._queues[client]
+                continue
+            self._queues.move_to_end(client)
+            self._queued -= 1
+            return queue.popleft()
+        return None
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        self._finished.append(job.id)
+        while len(self._finished) > self.keep_finished:
+            self.jobs.pop(self._finished.popleft(), None)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._available.acquire()
+            job = self._next_job()
+            if job is None:
+                # The job this slot was released for has been cancelled
+                continue
+            job.status = 'running'
+            job.started = time.time()
+            self._running += 1
+            try:
+                job.result = await loop.run_in_executor(self._executor, functools.partial(
+                    merge_files, job.inputs, job.output, cache=self.cache, **job.options))
+            except MergeError as e:
+                job.error = str(e)
+                self._finish(job, 'failed')
+            except Exception as e:
+                logger.exception("Job %s crashed", job.id)
+                job.error = f"{type(e).__name__}: {e}"
+                self._finish(job, 'failed')
+            else:
+                self._finish(job, 'done')
+            finally:
+                self._running -= 1
+            logger.info("Job %s %s", job.id, job.status)
+
+    def status(self):
+        info = {'queued': self._queued, 'running': self._running, 'concurrency': self.concurrency,
+                'clients': {client: len(queue) for client, queue in self._queues.items() if queue}}
+        if self.cache is not None:
+            info['cache'] = self.cache.stats()
+        return info
+
+    # HTTP
+
+    async def _handle(self, reader, writer):
+        try:
+            status, body, headers = await self._respond(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            logger.exception("Request failed")
+            status, body, headers = 500, {'error': str(e)}, {}
+        payload = json.dumps(body).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", "Content-Type: application/json",
+                f"Content-Length: {len(payload)}", "Connection: close"]
+        head.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _respond(self, reader, writer):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            return 400, {'error': 'malformed request line'}, {}
+        method, path, _ = request_line
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return 400, {'error': 'bad Content-Length'}, {}
+        if length > MAX_REQUEST_BYTES:
+            return 413, {'error': 'request body too large'}, {}
+        body = await reader.readexactly(length) if length else b''
+        peer = writer.get_extra_info('peername')
+        client = headers.get('x-client-id') or (peer[0] if isinstance(peer, tuple) else 'local')
+
+        parts = [part for part in path.split('?')[0].split('/') if part]
+        if parts == ['status'] and method == 'GET':
+            return 200, self.status(), {}
+        if parts == ['jobs'] and method == 'POST':
+            try:
+                inputs, output, options = parse_job_request(json.loads(body or b'null'))
+            except ValueError as e:
+                return 400, {'error': str(e)}, {}
+            try:
+                job = self.submit(client, inputs, output, options)
+            except ServiceBusy as e:
+                return 429, {'error': str(e)}, {'Retry-After': str(self.retry_after)}
+            return 202, job.to_dict(), {'Location': f"/jobs/{job.id}"}
+        if len(parts) == 2 and parts[0] == 'jobs':
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {'error': f"no job {parts[1]}"}, {}
+            if method == 'GET':
+                return 200, job.to_dict(), {}
+            if method == 'DELETE':
+                if not self.cancel(job.id):
+                    return 409, {'error': f"job {job.id} is {job.status}"}, {}
+                return 200, job.to_dict(), {}
+            return 405, {'error': f"{method} not allowed"}, {}
+        return 404, {'error': f"no route for {method} {path}"}, {}
+
+    # Lifecycle
+
+    async def start(self, host='127.0.0.1', port=8765, unix_socket=None):
+        self._available = asyncio.Semaphore(0)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency,
+                                                               thread_name_prefix='merge-job')
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        if unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+            logger.info("Listening on %s", unix_socket)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+            logger.info("Listening on http://%s:%d", host, port)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    async def serve_forever(self, **address):
+        await self.start(**address)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
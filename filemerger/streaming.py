@@ -0,0 +1,298 @@
+"""Streaming PDF writer for merges larger than memory.
+
+PdfMerger keeps every merged page, and everything it references, in memory
+until the output is written.  StreamingPdfWriter instead writes each page
+and the objects it references to the output file as soon as the page is
+added.  Only the object offsets and the list of page object numbers stay in
+memory, and they are written as the xref table and page tree in close().
+
+Objects are copied as they are stored in the source: stream data is written
+still compressed.  The objects each source reader caches are released once
+memory_limit bytes of stream data have been copied from it; sources read
+through a filemerger.mapped.MappedFile hand their stream data over as views
+of the mapping, so it is never copied onto the heap.  Outlines, named
+destinations and the structure tree are not carried over.  Links to pages
+(annotation /Dest arrays) are dropped, because the target page may not be
+part of the output.
+
+With dedup=True, every object is fingerprinted by its content and the
+fingerprints of the objects it references, and an object identical to one
+already written is replaced by a reference to that copy.  The fonts that
+each converted TXT file embeds, or a logo repeated on every invoice, are
+then stored once.  Objects that are part of a reference cycle or that point
+at a page are never shared.
+
+With compress=True, streams stored without a filter are deflated on a pool
+of threads (zlib releases the GIL) while the merge carries on; a bounded
+number of compressed streams wait to be written, so memory stays flat.
+object_streams=True packs the other objects into object streams, see
+filemerger.pdfraw.
+"""
+import collections
+import concurrent.futures
+import hashlib
+import io
+import logging
+import os
+import zlib
+
+from .pdfraw import RawPdfWriter
+
+logger = logging.getLogger(__name__)
+
+PDF_HEADER = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"
+# Source objects held in PdfReader's cache are released once this many
+# bytes of stream data have been copied from it
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+# "N 0 obj", "endobj" and the xref entry each written object costs
+_OBJECT_OVERHEAD = 40
+# Streams shorter than this are not worth a round trip to the compression threads
+_MIN_COMPRESS_BYTES = 256
+_COMPRESS_LEVEL = 6
+
+
+def _is_page(obj):
+    return isinstance(obj, dict) and obj.get('/Type') in ('/Page', '/Pages')
+
+
+class _Source:
+    """Per-reader state: the output number given to each source object."""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.ids = {}
+        self.bytes_since_release = 0
+        # (idnum, generation) -> (digest, shareable, size of the object and what it references)
+        self.digests = {}
+
+
+class StreamingPdfWriter:
+    """Append pages from PdfReaders, writing them to fileobj immediately."""
+
+    def __init__(self, fileobj, memory_limit=DEFAULT_MEMORY_LIMIT, dedup=False, compress=False,
+                 object_streams=False, workers=None):
+        self._pdf = RawPdfWriter(fileobj, header=PDF_HEADER, object_streams=object_streams)
+        self._pages_id = self._pdf.reserve()
+        self._kids = []
+        self._sources = {}
+        self._pending = []
+        self._by_digest = {} if dedup else None
+        self.memory_limit = memory_limit
+        self.shared_objects = 0
+        self.bytes_saved = 0
+        self._compressor = None
+        self._compressing = collections.deque()  # (obj_id, entries, data, future) in submission order
+        if compress:
+            workers = workers or os.cpu_count() or 1
+            self._compressor = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                                     thread_name_prefix='pdf-compress')
+            self._compress_window = workers * 4
+
+    @property
+    def page_count(self):
+        return len(self._kids)
+
+    def _source(self, reader):
+        source = self._sources.get(id(reader))
+        if source is None or source.reader is not reader:
+            source = self._sources[id(reader)] = _Source(reader)
+        return source
+
+    def add_pages(self, reader, page_numbers):
+        """Copy the given 0-based pages of reader to the output."""
+        source = self._source(reader)
+        for page_number in page_numbers:
+            self._add_page(source, page_number)
+
+    def _add_page(self, source, page_number):
+        from PyPDF2.generic import DictionaryObject, IndirectObject, NameObject
+
+        page = source.reader.pages[page_number]
+        page_id = self._pdf.reserve()
+        reference = page.indirect_reference
+        if reference is not None:
+            # References back to this page (e.g. an annotation's /P) point at this copy
+            source.ids[(reference.idnum, reference.generation)] = page_id
+        copy = DictionaryObject()
+        for key, value in dict.items(page):
+            if key in ('/Parent', '/StructParents'):
+                continue
+            copy[key] = self._remap(value, source)
+        copy[NameObject('/Parent')] = IndirectObject(self._pages_id, 0, None)
+        self._write(page_id, copy, source)
+        self._drain()
+        self._kids.append(page_id)
+        if source.bytes_since_release > self.memory_limit:
+            self.release(source.reader)
+
+    def release(self, reader):
+        """Drop the objects reader has cached; they are re-read if needed again."""
+        source = self._sources.get(id(reader))
+        if source is not None:
+            source.bytes_since_release = 0
+        reader.resolved_objects.clear()
+        # A memory-mapped source also gives back the file pages it has read (see filemerger.mapped)
+        if hasattr(reader.stream, 'release'):
+            reader.stream.release()
+
+    def forget(self, reader):
+        """Stop tracking reader; later pages from it get fresh copies of shared objects."""
+        self.release(reader)
+        self._sources.pop(id(reader), None)
+
+    def _remap(self, obj, source):
+        """Return a copy of a direct object with references renumbered for the output."""
+        from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject,
+                                    IndirectObject, StreamObject)
+
+        if isinstance(obj, IndirectObject):
+            return self._reference(obj, source)
+        if isinstance(obj, DictionaryObject):
+            if isinstance(obj, StreamObject):
+                copy = EncodedStreamObject() if '/Filter' in obj else DecodedStreamObject()
+                copy._data = obj._data
+            else:
+                copy = DictionaryObject()
+            for key, value in dict.items(obj):
+                copy[key] = self._remap(value, source)
+            return copy
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._remap(value, source) for value in list.__iter__(obj))
+        return obj
+
+    def _reference(self, reference, source):
+        from PyPDF2.generic import IndirectObject, NullObject
+
+        key = (reference.idnum, reference.generation)
+        new_id = source.ids.get(key)
+        if new_id is None:
+            target = reference.get_object()
+            if _is_page(target):
+                # Another page, or the source's page tree: not part of this copy
+                return NullObject()
+            if self._by_digest is not None:
+                digest, shareable, size = self._digest(reference, source, set())
+                if shareable:
+                    new_id = self._by_digest.get(digest)
+                    if new_id is not None:
+                        source.ids[key] = new_id
+                        self.shared_objects += 1
+                        self.bytes_saved += size
+                        return IndirectObject(new_id, 0, None)
+            new_id = source.ids[key] = self._pdf.reserve()
+            if self._by_digest is not None and shareable:
+                self._by_digest[digest] = new_id
+            self._pending.append((reference, source, new_id))
+        return IndirectObject(new_id, 0, None)
+
+    def _digest(self, reference, source, visiting):
+        """Return (digest, shareable, size) for the object reference points at."""
+        key = (reference.idnum, reference.generation)
+        known = source.digests.get(key)
+        if known is not None:
+            return known
+        target = reference.get_object()
+        if key in visiting or _is_page(target):
+            # Cycles and page links are fingerprinted by identity, which never matches another object
+            return b"%d:%d:%d" % (id(source), reference.idnum, reference.generation), False, 0
+        visiting.add(key)
+        digest = hashlib.sha256()
+        state = [True, _OBJECT_OVERHEAD]
+        self._fingerprint(target, source, visiting, digest, state)
+        visiting.discard(key)
+        known = source.digests[key] = (digest.digest(), state[0], state[1])
+        return known
+
+    def _fingerprint(self, obj, source, visiting, digest, state):
+        """Feed a canonical encoding of a direct object into digest."""
+        from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+        if isinstance(obj, IndirectObject):
+            child, shareable, size = self._digest(obj, source, visiting)
+            digest.update(b"R" + child)
+            state[0] = state[0] and shareable
+            state[1] += size
+        elif isinstance(obj, DictionaryObject):
+            digest.update(b"<<")
+            for key in sorted(dict.keys(obj)):
+                if key == '/Length' and isinstance(obj, StreamObject):
+                    continue
+                digest.update(key.encode('utf-8') + b" ")
+                self._fingerprint(dict.__getitem__(obj, key), source, visiting, digest, state)
+            digest.update(b">>")
+            if isinstance(obj, StreamObject):
+                digest.update(b"stream%d:" % len(obj._data))
+                digest.update(obj._data)
+                state[1] += len(obj._data)
+        elif isinstance(obj, ArrayObject):
+            digest.update(b"[")
+            for value in list.__iter__(obj):
+                self._fingerprint(value, source, visiting, digest, state)
+            digest.update(b"]")
+        else:
+            body = io.BytesIO()
+            if obj is None:
+                body.write(b"null")
+            else:
+                obj.write_to_stream(body, None)
+            digest.update(body.getvalue() + b" ")
+            state[1] += body.tell()
+
+    def _drain(self):
+        while self._pending:
+            reference, source, new_id = self._pending.pop()
+            self._write(new_id, self._remap(reference.get_object(), source), source)
+
+    def _write(self, obj_id, obj, source):
+        from PyPDF2.generic import DictionaryObject, StreamObject
+
+        if isinstance(obj, StreamObject):
+            data = obj._data
+            entries = io.BytesIO()
+            # Serialize only the dictionary so the (possibly large) data is written without a copy
+            DictionaryObject((key, value) for key, value in dict.items(obj) if key != '/Length').write_to_stream(
+                entries, None)
+            source.bytes_since_release += len(data)
+            if (self._compressor is not None and len(data) >= _MIN_COMPRESS_BYTES and '/Filter' not in obj
+                    and '/DecodeParms' not in obj):
+                future = self._compressor.submit(zlib.compress, data, _COMPRESS_LEVEL)
+                self._compressing.append((obj_id, entries.getvalue()[2:-2], data, future))
+                if len(self._compressing) > self._compress_window:
+                    self._write_compressed()
+                return
+            self._pdf.write_stream(obj_id, entries.getvalue()[2:-2], data)
+        else:
+            body = io.BytesIO()
+            if obj is None:
+                body.write(b"null")
+            else:
+                obj.write_to_stream(body, None)
+            self._pdf.write_object(obj_id, body.getvalue())
+
+    def _write_compressed(self):
+        """Write the oldest stream sent for compression, waiting for it if needed."""
+        obj_id, entries, data, future = self._compressing.popleft()
+        compressed = future.result()
+        if len(compressed) < len(data):
+            self._pdf.write_stream(obj_id, entries + b" /Filter /FlateDecode", compressed)
+        else:
+            self._pdf.write_stream(obj_id, entries, data)
+
+    def shutdown(self):
+        """Stop the compression threads; streams still waiting are dropped."""
+        if self._compressor is not None:
+            self._compressing.clear()
+            self._compressor.shutdown(wait=False, cancel_futures=True)
+            self._compressor = None
+
+    def close(self):
+        """Write the page tree, catalog, xref table and trailer."""
+        while self._compressing:
+            self._write_compressed()
+        self.shutdown()
+        kids = b" ".join(b"%d 0 R" % kid for kid in self._kids)
+        self._pdf.write_object(self._pages_id, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._kids)))
+        catalog_id = self._pdf.reserve()
+        self._pdf.write_object(catalog_id, b"<< /Type /Catalog /Pages %d 0 R >>" % self._pages_id)
+        self._pdf.close(catalog_id)
+        self._sources.clear()
@@ -0,0 +1,202 @@
+"""Nested timing spans for the stages of a merge.
+
+Tracing is off until enable() is called.  While it is off, span() returns a
+shared do-nothing object, so instrumented code pays one function call per
+stage and builds no records.  Attributes that are costly to compute should
+be set only when enabled() is true.
+
+Finished spans are passed to every sink given to enable().  A sink is any
+callable taking a Span, which is also the hook for metrics systems.
+JsonLinesSink, ChromeTraceSink (for chrome://tracing and Perfetto) and
+LogSink are provided.
+
+Spans are kept per thread.  Worker processes never inherit the parent's
+tracer; conversions run there are recorded by the parent with record().
+"""
+import itertools
+import json
+import os
+import threading
+import time
+
+_tracer = None
+_ids = itertools.count(1)
+_local = threading.local()
+
+
+class Span:
+    """A timed stage with attributes; times are time.perf_counter() seconds."""
+
+    __slots__ = ('name', 'attributes', 'span_id', 'parent_id', 'start', 'end', 'pid', 'thread_id')
+
+    def __init__(self, name, attributes, parent_id=None, start=None):
+        self.name = name
+        self.attributes = attributes
+        self.span_id = next(_ids)
+        self.parent_id = parent_id
+        self.start = start
+        self.end = None
+        self.pid = os.getpid()
+        self.thread_id = threading.get_ident()
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent_id = stack[-1].span_id if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        tracer = _tracer
+        if tracer is not None:
+            tracer.emit(self)
+        return False
+
+    def to_dict(self):
+        return {'name': self.name, 'id': self.span_id, 'parent': self.parent_id, 'start': self.start,
+                'duration': self.duration, 'pid': self.pid, 'thread': self.thread_id,
+                'attributes': self.attributes}
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class Tracer:
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        self._lock = threading.Lock()
+
+    def emit(self, span):
+        with self._lock:
+            for sink in self.sinks:
+                sink(span)
+
+    def close(self):
+        for sink in self.sinks:
+            close = getattr(sink, 'close', None)
+            if close is not None:
+                close()
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, **attributes):
+    """Return a context manager timing one stage; a no-op unless tracing is enabled."""
+    if _tracer is None:
+        return _NOOP
+    return Span(name, attributes)
+
+
+def record(name, start, end, **attributes):
+    """Record a stage timed elsewhere, e.g. in a worker process, under the current span."""
+    tracer = _tracer
+    if tracer is None:
+        return
+    stack = _stack()
+    finished = Span(name, attributes, stack[-1].span_id if stack else None, start)
+    finished.end = end
+    tracer.emit(finished)
+
+
+def enable(*sinks):
+    """Start sending finished spans to sinks; returns the Tracer."""
+    global _tracer
+    disable()
+    _tracer = Tracer(sinks)
+    return _tracer
+
+
+def disable():
+    """Stop tracing and close the sinks of the active tracer."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+
+
+def _forget_in_child():
+    # A forked worker must not write to the parent's sinks
+    global _tracer
+    _tracer = None
+    _local.__dict__.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_in_child)
+
+
+class JsonLinesSink:
+    """Write each finished span as one JSON object per line."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def __call__(self, span):
+        self.file.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class ChromeTraceSink:
+    """Collect spans and write them in Chrome's trace event format on close."""
+
+    def __init__(self, path):
+        self.path = path
+        self.events = []
+
+    def __call__(self, span):
+        self.events.append({'name': span.name, 'ph': 'X', 'ts': span.start * 1e6, 'dur': span.duration * 1e6,
+                            'pid': span.pid, 'tid': span.thread_id, 'args': span.attributes})
+
+    def close(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+
+class LogSink:
+    """Log each finished span, e.g. for per-file timings at debug level."""
+
+    def __init__(self, logger, level):
+        self.logger = logger
+        self.level = level
+
+    def __call__(self, span):
+        if self.logger.isEnabledFor(self.level):
+            attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+            self.logger.log(self.level, "%s %.3fs %s", span.name, span.duration, attributes)
@@ -0,0 +1,275 @@
+"""Keep a merged PDF up to date with a folder or a manifest of inputs.
+
+A FolderWatcher merges every supported file in a directory, in name order,
+or the entries of a JSON manifest:
+
+    {"inputs": ["cover.pdf", ["report.pdf", "1,3-5"], {"path": "notes.txt", "pages": "2"}]}
+
+Converted inputs are kept as PDF parts, together with the mtime and size they
+were converted from, in a parts directory next to the output.  A rebuild
+converts only the inputs that were added or changed and reassembles the
+output from the parts.  The output is written to a temp file and renamed
+over the old one, so readers never see a half-written PDF.
+
+Changes are found by polling.  If the watchdog package is installed, its
+inotify/FSEvents observer wakes the watcher as soon as something changes.
+Events that arrive in a burst are debounced: a rebuild starts once nothing
+has changed for `debounce` seconds.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from .engine import merge_files, parse_page_ranges, replace_file
+from .errors import ConversionError, MergeError
+from .registry import get_converter
+
+logger = logging.getLogger(__name__)
+
+_INDEX = "index.json"
+
+
+def manifest_inputs(entries, base, source):
+    """Return [(absolute path, pages)] for manifest input entries; paths are relative to base.
+
+    An entry is a path, a [path, pages] pair or {"path": ..., "pages": ...},
+    where pages is a page-range string such as "1,3-5" or a list of 0-based
+    page indexes.  source names the manifest in errors.
+    """
+    if not isinstance(entries, list):
+        raise MergeError(f"{source}: expected a list of inputs")
+    inputs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            file, pages = entry, ''
+        elif isinstance(entry, list) and len(entry) == 2:
+            file, pages = entry
+        elif isinstance(entry, dict) and 'path' in entry:
+            file, pages = entry['path'], entry.get('pages', '')
+        else:
+            raise MergeError(f"{source}: invalid input {entry!r}")
+        if isinstance(pages, str):
+            try:
+                pages = parse_page_ranges(pages)
+            except ValueError as e:
+                raise MergeError(f"{source}: {file}: {e}") from e
+        inputs.append((os.path.join(base, file), list(pages)))
+    return inputs
+
+
+def read_manifest(path):
+    """Return [(absolute path, pages)] from a JSON manifest; paths are relative to it."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    entries = data.get('inputs') if isinstance(data, dict) else data
+    return manifest_inputs(entries, os.path.dirname(os.path.abspath(path)), path)
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FolderWatcher:
+    """Rebuild output whenever the inputs of source (a directory or a .json manifest) change."""
+
+    def __init__(self, source, output, parts_dir=None, interval=1.0, debounce=0.5, **merge_options):
+        self.source = os.path.abspath(source)
+        self.output = os.path.abspath(output)
+        self.interval = interval
+        self.debounce = debounce
+        self.merge_options = merge_options
+        self.parts_dir = os.path.abspath(parts_dir or os.path.join(
+            os.path.dirname(self.output), "." + os.path.basename(self.output) + ".parts"))
+        os.makedirs(self.parts_dir, exist_ok=True)
+        # input path -> {'signature': [mtime_ns, size], 'part': file name in parts_dir}
+        self.parts = self._load_index()
+        self._wake = threading.Event()
+        self._observer = None
+        self.rebuilds = 0
+
+    # State
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.parts_dir, _INDEX), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        fd, temp_path = tempfile.mkstemp(dir=self.parts_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.parts, f)
+        os.replace(temp_path, os.path.join(self.parts_dir, _INDEX))
+
+    def inputs(self):
+        """Return the current [(path, pages)] to merge."""
+        if not os.path.isdir(self.source):
+            return read_manifest(self.source)
+        inputs = []
+        for entry in sorted(os.scandir(self.source), key=lambda entry: entry.name):
+            if not entry.is_file() or entry.name.startswith('.') or entry.path == self.output:
+                continue
+            ext = os.path.splitext(entry.name)[1].lower()
+            if ext == '.pdf' or get_converter(entry.path) is not None:
+                inputs.append((entry.path, []))
+        return inputs
+
+    def snapshot(self):
+        """Signatures of everything a rebuild depends on."""
+        watched = {} if os.path.isdir(self.source) else {self.source: _signature(self.source)}
+        try:
+            for path, _ in self.inputs():
+                watched[path] = _signature(path)
+        except (OSError, ValueError, MergeError) as e:
+            # A manifest caught mid-write; the next scan will see the finished file
+            watched[self.source] = ('unreadable', str(e))
+        return watched
+
+    # Rebuild
+
+    def _convert(self, path, signature):
+        """Return the path of an up-to-date PDF part for path, converting it if needed."""
+        known = self.parts.get(path)
+        if known and tuple(known['signature']) == signature and os.path.exists(
+                os.path.join(self.parts_dir, known['part'])):
+            return os.path.join(self.parts_dir, known['part']), False
+        converter = get_converter(path)
+        fd, temp_path = tempfile.mkstemp(dir=self.parts_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                converter(path, f)
+            part = hashlib.sha1(path.encode('utf-8')).hexdigest() + ".pdf"
+            os.replace(temp_path, os.path.join(self.parts_dir, part))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.parts[path] = {'signature': list(signature), 'part': part}
+        return os.path.join(self.parts_dir, part), True
+
+    def rebuild(self):
+        """Convert changed inputs and reassemble the output; return a summary dict."""
+        start = time.monotonic()
+        inputs = self.inputs()
+        entries = []
+        converted = reused = 0
+        errors = []
+        for path, pages in inputs:
+            signature = _signature(path)
+            if signature is None:
+                errors.append((path, f"File {path} does not exist"))
+                continue
+            if os.path.splitext(path)[1].lower() == '.pdf':
+                entries.append((path, pages))
+                continue
+            try:
+                part, fresh = self._convert(path, signature)
+            except ConversionError as e:
+                errors.append((path, str(e)))
+                continue
+            converted += fresh
+            reused += not fresh
+            entries.append((part, pages))
+
+        # Parts of inputs that are gone
+        current = {path for path, _ in inputs}
+        for path in [path for path in self.parts if path not in current]:
+            try:
+                os.remove(os.path.join(self.parts_dir, self.parts.pop(path)['part']))
+            except OSError:
+                pass
+        self._save_index()
+
+        if not entries:
+            raise MergeError("No inputs to merge")
+        directory, name = os.path.split(self.output)
+        fd, temp_output = tempfile.mkstemp(dir=directory, prefix=name + '.', suffix='.part')
+        os.close(fd)
+        try:
+            result = merge_files(entries, temp_output, **self.merge_options)
+            replace_file(temp_output, self.output)
+        finally:
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+        self.rebuilds += 1
+        summary = {'inputs': len(inputs), 'converted': converted, 'reused': reused,
+                   'pages': result.page_count, 'errors': errors + result.errors,
+                   'elapsed': time.monotonic() - start}
+        logger.info("Rebuilt %s: %d pages, %d converted, %d reused in %.2fs", self.output, summary['pages'],
+                    converted, reused, summary['elapsed'])
+        for _, message in summary['errors']:
+            logger.warning("%s", message)
+        return summary
+
+    # Watching
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.debug("watchdog is not installed; polling every %ss", self.interval)
+            return
+        wake = self._wake
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wake.set()
+
+        directories = {self.source if os.path.isdir(self.source) else os.path.dirname(self.source)}
+        try:
+            directories.update(os.path.dirname(path) for path, _ in self.inputs())
+        except (OSError, ValueError, MergeError):
+            pass
+        self._observer = Observer()
+        for directory in directories:
+            if os.path.isdir(directory) and not directory.startswith(self.parts_dir):
+                self._observer.schedule(_Handler(), directory, recursive=False)
+        self._observer.start()
+
+    def _wait_until_quiet(self, snapshot, stop):
+        """Return the snapshot once it has stayed unchanged for the debounce period."""
+        while not stop.wait(self.debounce):
+            latest = self.snapshot()
+            if latest == snapshot:
+                return snapshot
+            snapshot = latest
+        return snapshot
+
+    def run(self, stop=None):
+        """Build once, then rebuild after every change until stop (a threading.Event) is set."""
+        stop = stop or threading.Event()
+        self._start_observer()
+        try:
+            snapshot = self.snapshot()
+            self._rebuild_logged()
+            while not stop.is_set():
+                self._wake.wait(self.interval)
+                self._wake.clear()
+                if stop.is_set():
+                    break
+                latest = self.snapshot()
+                if latest == snapshot:
+                    continue
+                snapshot = self._wait_until_quiet(latest, stop)
+                if not stop.is_set():
+                    self._rebuild_logged()
+        finally:
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer.join()
+                self._observer = None
+
+    def _rebuild_logged(self):
+        try:
+            return self.rebuild()
+        except MergeError as e:
+            logger.error("Rebuild of %s failed: %s", self.output, e)
@@ -0,0 +1,278 @@
+"""Pool of persistent conversion worker processes.
+
+Starting a conversion backend can cost more than the conversion itself; Word
+in particular takes seconds to launch.  A WorkerPool keeps backends running
+in child processes and reuses them across files and merges.  Workers that
+die are replaced, workers are recycled after max_jobs conversions, and a job
+that exceeds its timeout kills its worker so one hung document cannot stall
+the rest of the batch.  The kill takes the processes the backend started
+with it: a worker leads its own process group on POSIX and is killed as a
+process tree on Windows, and a backend whose helper is not its child (Word
+is started by COM) reports the helper's pid through on_process.
+
+A backend is any object with ``convert(input_path, output_path)`` and
+``close()``.  The pool is given a picklable factory that builds the backend
+inside the worker process, e.g. ``functools.partial(CommandBackend, [...])``.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .errors import ConversionError
+
+logger = logging.getLogger(__name__)
+
+
+class CommandBackend:
+    """Convert by running a local command line, e.g. LibreOffice.
+
+    Each argument may contain the placeholders {input}, {output} and
+    {outdir}.  If the command line does not mention {output}, the single PDF
+    the command leaves in {outdir} is moved there instead, which suits
+    ``soffice --headless --convert-to pdf --outdir {outdir} {input}``.
+    """
+
+    def __init__(self, args, timeout=None):
+        self.args = list(args)
+        self.timeout = timeout
+
+    def convert(self, input_path, output_path):
+        with tempfile.TemporaryDirectory(prefix='filemerger_') as outdir:
+            command = [arg.format(input=input_path, output=output_path, outdir=outdir) for arg in self.args]
+            completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       timeout=self.timeout)
+            if completed.returncode != 0:
+                raise ConversionError(f"{command[0]} exited with {completed.returncode}: "
+                                      f"{completed.stderr.decode(errors='replace').strip()}")
+            if any('{output}' in arg for arg in self.args):
+                return
+            produced = [name for name in os.listdir(outdir) if name.lower().endswith('.pdf')]
+            if len(produced) != 1:
+                raise ConversionError(f"{command[0]} did not produce a PDF for {input_path}")
+            shutil.move(os.path.join(outdir, produced[0]), output_path)
+
+    def close(self):
+        pass
+
+
+def kill_process_tree(pid):
+    """Kill pid and the processes it started; a pid that is gone is ignored."""
+    if sys.platform == 'win32':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        return
+    try:
+        # Workers lead their own process group, so commands they run are in it too
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def _worker_main(conn, backend_factory):
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    backend = backend_factory()
+    if hasattr(backend, 'on_process'):
+        # Helpers the worker did not start itself, killed with it if a job times out
+        backend.on_process = lambda pid: conn.send(('process', pid))
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            command = message[0]
+            if command == 'stop':
+                break
+            if command == 'ping':
+                conn.send(('pong',))
+                continue
+            _, input_path, output_path = message
+            try:
+                backend.convert(input_path, output_path)
+            except Exception as e:
+                conn.send(('error', str(e)))
+            else:
+                conn.send(('ok',))
+    finally:
+        try:
+            backend.close()
+        except Exception:
+            pass
+
+
+class _Worker:
+    def __init__(self, context, backend_factory):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, backend_factory), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.last_used = time.monotonic()
+        self.processes = set()  # pids reported by the backend during the current job
+
+    def ping(self, timeout):
+        try:
+            self.conn.send(('ping',))
+            return self.conn.poll(timeout) and self.conn.recv() == ('pong',)
+        except (OSError, EOFError):
+            return False
+
+    def stop(self, timeout=5):
+        try:
+            self.conn.send(('stop',))
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self):
+        # Also kills what the backend started, even if the worker itself has already died; on
+        # Windows a dead worker's pid may already belong to an unrelated process
+        if self.process.is_alive() or sys.platform != 'win32':
+            kill_process_tree(self.process.pid)
+        for pid in self.processes:
+            kill_process_tree(pid)
+        self.processes.clear()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """Thread-safe pool of long-lived backend processes.
+
+    size workers are started lazily.  Each one serves up to max_jobs
+    conversions before it is replaced with a fresh process; a conversion
+    that takes longer than job_timeout seconds kills its worker and raises
+    ConversionError.  Idle workers unused for health_check_interval seconds
+    are pinged before they get a job.
+    """
+
+    def __init__(self, backend_factory, size=1, max_jobs=100, job_timeout=300, health_check_interval=60,
+                 start_method=None):
+        self.backend_factory = backend_factory
+        self.size = size
+        self.max_jobs = max_jobs
+        self.job_timeout = job_timeout
+        self.health_check_interval = health_check_interval
+        self._context = multiprocessing.get_context(start_method)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._closed = False
+        self.jobs_done = 0
+        self.restarts = 0
+
+    def _acquire(self):
+        with self._lock:
+            if self._closed:
+                raise ConversionError("Worker pool is closed")
+            if self._idle.empty() and self._started < self.size:
+                self._started += 1
+                return _Worker(self._context, self.backend_factory)
+        worker = self._idle.get()
+        if not self._healthy(worker):
+            logger.warning("Replacing unresponsive conversion worker (pid %s)", worker.process.pid)
+            worker.kill()
+            self.restarts += 1
+            worker = _Worker(self._context, self.backend_factory)
+        return worker
+
+    def _healthy(self, worker):
+        if not worker.process.is_alive():
+            return False
+        if time.monotonic() - worker.last_used < self.health_check_interval:
+            return True
+        return worker.ping(timeout=5)
+
+    def _release(self, worker):
+        worker.last_used = time.monotonic()
+        if worker.jobs >= self.max_jobs:
+            logger.debug("Recycling conversion worker (pid %s) after %d jobs", worker.process.pid, worker.jobs)
+            worker.stop()
+            self.restarts += 1
+            worker = _Worker(self._context, self.backend_factory)
+        with self._lock:
+            if self._closed:
+                worker.stop()
+                return
+        self._idle.put(worker)
+
+    def convert(self, input_path, output_path, timeout=None):
+        """Convert input_path to the PDF path output_path on a pooled worker."""
+        timeout = self.job_timeout if timeout is None else timeout
+        worker = self._acquire()
+        try:
+            worker.conn.send(('convert', os.path.abspath(input_path), os.path.abspath(output_path)))
+            deadline = time.monotonic() + timeout
+            while True:
+                if not worker.conn.poll(max(0, deadline - time.monotonic())):
+                    raise TimeoutError
+                reply = worker.conn.recv()
+                if reply[0] != 'process':
+                    break
+                worker.processes.add(reply[1])
+        except TimeoutError:
+            worker.kill()
+            self._replace(worker)
+            raise ConversionError(f"Conversion of {input_path} timed out after {timeout}s") from None
+        except (OSError, EOFError) as e:
+            worker.kill()
+            self._replace(worker)
+            raise ConversionError(f"Conversion worker for {input_path} died: {e}") from e
+        worker.processes.clear()
+        worker.jobs += 1
+        self.jobs_done += 1
+        self._release(worker)
+        if reply[0] == 'error':
+            raise ConversionError(f"Failed to convert {input_path}: {reply[1]}")
+
+    def _replace(self, worker):
+        self.restarts += 1
+        with self._lock:
+            if self._closed:
+                return
+        self._idle.put(_Worker(self._context, self.backend_factory))
+
+    def health_check(self):
+        """Ping every idle worker and replace the ones that do not answer; return how many were replaced."""
+        replaced = 0
+        workers = []
+        while True:
+            try:
+                workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            if not (worker.process.is_alive() and worker.ping(timeout=5)):
+                worker.kill()
+                worker = _Worker(self._context, self.backend_factory)
+                self.restarts += 1
+                replaced += 1
+            self._idle.put(worker)
+        return replaced
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
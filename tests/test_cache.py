@@ -0,0 +1,85 @@
+import io
+import os
+import pickle
+import tempfile
+import time
+import unittest
+
+from filemerger.cache import ConversionCache
+from filemerger.engine import merge_files
+
+
+class ConversionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = ConversionCache(os.path.join(self.directory.name, 'cache'), max_bytes=2500)
+
+    def source(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def store(self, key, size, age):
+        self.cache.store(key, io.BytesIO(b"x" * size))
+        # Entries are least recently used in order of age
+        past = time.time() - age
+        os.utime(self.cache._path(key), (past, past))
+
+    def fetch(self, key):
+        output = io.BytesIO()
+        return self.cache.fetch(key, output), output.getvalue()
+
+    def test_key_follows_content_and_options(self):
+        path = self.source('a.txt', "hello")
+        copy = self.source('b.txt', "hello")
+        key = self.cache.key(path, 'txt_to_pdf', 1, {'wrap_text': True})
+        self.assertEqual(self.cache.key(copy, 'txt_to_pdf', 1, {'wrap_text': True}), key)
+        self.assertNotEqual(self.cache.key(path, 'txt_to_pdf', 2, {'wrap_text': True}), key)
+        self.assertNotEqual(self.cache.key(path, 'txt_to_pdf', 1, {'wrap_text': False}), key)
+        self.source('a.txt', "edited")
+        self.assertNotEqual(self.cache.key(path, 'txt_to_pdf', 1, {'wrap_text': True}), key)
+
+    def test_hit_and_miss(self):
+        self.assertEqual(self.fetch('ab' * 32), (False, b""))
+        self.cache.store('ab' * 32, io.BytesIO(b"%PDF-1.4 data"))
+        self.assertEqual(self.fetch('ab' * 32), (True, b"%PDF-1.4 data"))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+        self.assertEqual(self.cache.stats()['stores'], 1)
+
+    def test_evicts_least_recently_used(self):
+        self.store('aa' * 32, 1000, 30)
+        self.store('bb' * 32, 1000, 20)
+        # A hit makes the oldest entry the most recently used
+        self.assertTrue(self.fetch('aa' * 32)[0])
+        self.store('cc' * 32, 1000, 10)
+        self.assertTrue(self.fetch('aa' * 32)[0])
+        self.assertFalse(self.fetch('bb' * 32)[0])
+        self.assertTrue(self.fetch('cc' * 32)[0])
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_worker_copies_leave_eviction_to_the_parent(self):
+        worker = pickle.loads(pickle.dumps(self.cache))
+        for number in range(3):
+            worker.store(f"{number:02d}" * 32, io.BytesIO(b"x" * 1000))
+        self.assertEqual(worker.stats()['evictions'], 0)
+        self.assertEqual(self.cache._scan()[1], 3000)
+        self.cache.add_stats(worker.stats())
+        self.assertEqual(self.cache.stats()['stores'], 3)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertLessEqual(self.cache._scan()[1], self.cache.max_bytes)
+
+    def test_merge_converts_once(self):
+        text = self.source('notes.txt', "cached text\n")
+        output = os.path.join(self.directory.name, 'out.pdf')
+        self.cache.max_bytes = 10 * 1024 * 1024
+        self.assertTrue(merge_files([text], output, cache=self.cache).ok)
+        self.assertEqual((self.cache.hits, self.cache.misses, self.cache.stores), (0, 1, 1))
+        self.assertTrue(merge_files([text], output, cache=self.cache).ok)
+        self.assertEqual((self.cache.hits, self.cache.misses, self.cache.stores), (1, 1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
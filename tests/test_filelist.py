@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from filemerger.filelist import FileList, scan_folder
+
+
+class FileListTest(unittest.TestCase):
+    def setUp(self):
+        self.files = FileList()
+        self.a, self.b, self.c = (os.path.abspath(name) for name in ('a.pdf', 'b.txt', 'c.png'))
+
+    def assertConsistent(self):
+        # _counts must always match the paths actually listed
+        counts = {}
+        for path in self.files.paths:
+            counts[path] = counts.get(path, 0) + 1
+        self.assertEqual(self.files._counts, counts)
+        self.assertEqual(len(self.files.pages), len(self.files.paths))
+
+    def test_add_skips_listed_paths(self):
+        self.assertEqual(self.files.add(['a.pdf', 'b.txt']), [self.a, self.b])
+        self.assertEqual(self.files.add([self.a, 'c.png', 'c.png']), [self.c])
+        self.assertEqual(self.files.paths, [self.a, self.b, self.c])
+        self.assertIn('b.txt', self.files)
+        self.assertConsistent()
+
+    def test_duplicate_copies_the_page_selection(self):
+        self.files.add(['a.pdf', 'b.txt'])
+        self.files.set_pages(0, [1, 2])
+        self.assertEqual(self.files.duplicate(0), 1)
+        self.assertEqual(self.files.entries(), [(self.a, [1, 2]), (self.a, [1, 2]), (self.b, [])])
+        self.files.set_pages(1, [0])
+        self.assertEqual(self.files[0], (self.a, [1, 2]))
+        self.assertEqual(self.files._counts[self.a], 2)
+        self.assertConsistent()
+
+    def test_remove_keeps_other_copies(self):
+        self.files.add(['a.pdf', 'b.txt', 'c.png'])
+        self.files.duplicate(0)
+        self.files.remove([0, 3])
+        self.assertEqual(self.files.paths, [self.a, self.b])
+        self.assertIn(self.a, self.files)
+        self.assertNotIn(self.c, self.files)
+        self.assertConsistent()
+        self.files.remove([0])
+        self.assertNotIn(self.a, self.files)
+        self.assertEqual(self.files.add(['a.pdf']), [self.a])
+        self.assertConsistent()
+
+    def test_move(self):
+        self.files.add(['a.pdf', 'b.txt', 'c.png'])
+        self.files.set_pages(2, [4])
+        self.assertEqual(self.files.move(2, -1), 1)
+        self.assertEqual(self.files.entries(), [(self.a, []), (self.c, [4]), (self.b, [])])
+        self.assertIsNone(self.files.move(0, -1))
+        self.assertIsNone(self.files.move(2, 1))
+        self.assertConsistent()
+
+
+class ScanFolderTest(unittest.TestCase):
+    def test_depth_first_in_name_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ('b.pdf', 'A.txt', 'skip.exe', os.path.join('sub', 'c.png'), os.path.join('Z', 'd.pdf')):
+                path = os.path.join(directory, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, 'w').close()
+            found = [os.path.relpath(path, directory) for path in scan_folder(directory, ['.pdf', '.TXT', '.png'])]
+        self.assertEqual(found, ['A.txt', 'b.pdf', os.path.join('sub', 'c.png'), os.path.join('Z', 'd.pdf')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from filemerger.index import read_pdf_info
+from filemerger.pdfraw import RawPdfWriter
+
+
+def write_pdf(path, page_count, indirect_count=False):
+    with open(path, 'wb') as f:
+        pdf = RawPdfWriter(f)
+        pages_id = pdf.reserve()
+        kids = []
+        for _ in range(page_count):
+            page_id = pdf.reserve()
+            pdf.write_object(page_id, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] >>" % pages_id)
+            kids.append(page_id)
+        if indirect_count:
+            count_id = pdf.reserve()
+            pdf.write_object(count_id, b"%d" % page_count)
+            count = b"%d 0 R" % count_id
+        else:
+            count = b"%d" % page_count
+        pdf.write_object(pages_id, b"<< /Type /Pages /Kids [%s] /Count %s >>" % (
+            b" ".join(b"%d 0 R" % kid for kid in kids), count))
+        catalog_id = pdf.reserve()
+        pdf.write_object(catalog_id, b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+        pdf.close(catalog_id)
+
+
+class ReadPdfInfoTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_direct_count(self):
+        path = os.path.join(self.directory.name, 'direct.pdf')
+        write_pdf(path, 12)
+        info = read_pdf_info(path)
+        self.assertIsNone(info.error)
+        self.assertEqual(info.pages, 12)
+        self.assertFalse(info.encrypted)
+
+    def test_indirect_count_is_not_read_as_its_object_number(self):
+        # /Count 14 0 R used to match as /Count 1
+        path = os.path.join(self.directory.name, 'indirect.pdf')
+        write_pdf(path, 12, indirect_count=True)
+        with open(path, 'rb') as f:
+            self.assertIn(b"/Count 14 0 R", f.read())
+        info = read_pdf_info(path)
+        self.assertIsNone(info.error)
+        self.assertEqual(info.pages, 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
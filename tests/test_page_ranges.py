@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from filemerger.engine import format_page_ranges, merge_files, parse_page_ranges
+from filemerger.errors import MergeError
+from filemerger.index import PdfIndex
+
+
+class PageRangesTest(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_page_ranges(""), [])
+        self.assertEqual(parse_page_ranges("  "), [])
+        self.assertEqual(parse_page_ranges("1,3-5"), [0, 2, 3, 4])
+        self.assertEqual(parse_page_ranges(" 2 , 7-7 "), [1, 6])
+
+    def test_format(self):
+        self.assertEqual(format_page_ranges([]), "")
+        self.assertEqual(format_page_ranges([0, 2, 3, 4]), "1,3-5")
+        self.assertEqual(format_page_ranges([4, 3, 9]), "5,4,10")
+
+    def test_round_trip(self):
+        for spec in ("1", "1-3", "1,3-5", "2-4,7,9-12", "10,1-2"):
+            self.assertEqual(format_page_ranges(parse_page_ranges(spec)), spec)
+        for pages in ([0], [5, 6, 7], [0, 2, 4], [8, 9, 0, 1]):
+            self.assertEqual(parse_page_ranges(format_page_ranges(pages)), pages)
+
+    def test_rejects_invalid_specs(self):
+        for spec in ("0", "-1", "3-1", "0-2", "a", "1-", "1-2-3", "1,,2"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_page_ranges(spec)
+
+
+class PageSelectionValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        texts = []
+        for number in range(3):
+            path = os.path.join(self.directory.name, f"{number}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"page {number}\n")
+            texts.append(path)
+        self.pdf = os.path.join(self.directory.name, 'three.pdf')
+        merge_files(texts, self.pdf)
+        self.output = os.path.join(self.directory.name, 'out.pdf')
+
+    def test_selection_outside_the_pdf_uses_all_pages(self):
+        result = merge_files([(self.pdf, [5, 9])], self.output, index=PdfIndex())
+        self.assertEqual(result.page_count, 3)
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn("No valid pages selected", result.errors[0][1])
+
+    def test_selection_inside_the_pdf(self):
+        result = merge_files([(self.pdf, [2, 0])], self.output, index=PdfIndex())
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.page_count, 2)
+
+    def test_strict_fails_before_converting(self):
+        with self.assertRaises(MergeError):
+            merge_files([(self.pdf, [5])], self.output, strict=True, index=PdfIndex())
+        self.assertFalse(os.path.exists(self.output))
+
+
+if __name__ == '__main__':
+    unittest.main()
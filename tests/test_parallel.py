@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from PyPDF2 import PdfReader
+
+from filemerger.engine import merge_files
+
+
+def page_texts(path):
+    return [page.extract_text().strip() for page in PdfReader(path).pages]
+
+
+class ParallelMergeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.texts = []
+        for number in range(6):
+            path = self.path(f"{number}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"input {number}\n")
+            self.texts.append(path)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def merge(self, inputs, workers):
+        output = self.path(f"out-{workers}.pdf")
+        return merge_files(inputs, output, workers=workers), output
+
+    def test_keeps_input_order(self):
+        serial, serial_output = self.merge(self.texts, None)
+        parallel, parallel_output = self.merge(self.texts, 2)
+        self.assertEqual(serial.errors, [])
+        self.assertEqual(parallel.errors, [])
+        self.assertEqual(page_texts(parallel_output), [f"input {number}" for number in range(6)])
+        self.assertEqual(page_texts(parallel_output), page_texts(serial_output))
+
+    def test_reports_each_failed_input(self):
+        bad_image = self.path("bad.png")
+        with open(bad_image, 'wb') as f:
+            f.write(b"not a png")
+        missing = self.path("missing.txt")
+        inputs = [self.texts[0], bad_image, missing, self.texts[1]]
+        serial, serial_output = self.merge(inputs, None)
+        parallel, parallel_output = self.merge(inputs, 2)
+        self.assertEqual(sorted(file for file, _ in parallel.errors), sorted([bad_image, missing]))
+        self.assertEqual(sorted(parallel.errors), sorted(serial.errors))
+        self.assertEqual(parallel.page_count, 2)
+        self.assertEqual(page_texts(parallel_output), ["input 0", "input 1"])
+        self.assertEqual(page_texts(parallel_output), page_texts(serial_output))
+
+    def test_repeated_input_keeps_each_place(self):
+        inputs = [self.texts[0], self.texts[1], self.texts[0]]
+        result, output = self.merge(inputs, 2)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(page_texts(output), ["input 0", "input 1", "input 0"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from PyPDF2 import PdfReader
+
+from filemerger.engine import merge_files
+
+
+def pages(path):
+    return [(page.extract_text().strip(), [float(value) for value in page.mediabox])
+            for page in PdfReader(path).pages]
+
+
+class StreamingOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        texts = []
+        for number in range(4):
+            path = self.path(f"{number}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"page {number}\n")
+            texts.append(path)
+        self.notes = texts[0]
+        self.source = self.path('source.pdf')
+        merge_files(texts, self.source)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def assertSameOutput(self, inputs, **options):
+        buffered = merge_files(inputs, self.path('buffered.pdf'))
+        streamed = merge_files(inputs, self.path('streamed.pdf'), **options)
+        self.assertEqual(streamed.errors, buffered.errors)
+        self.assertEqual(streamed.page_count, buffered.page_count)
+        self.assertEqual(pages(self.path('streamed.pdf')), pages(self.path('buffered.pdf')))
+
+    def test_whole_files(self):
+        self.assertSameOutput([self.source, self.notes, self.source], streaming=True)
+
+    def test_page_selections(self):
+        self.assertSameOutput([(self.source, [3, 0]), self.notes, (self.source, [1, 2])], streaming=True)
+
+    def test_small_memory_limit(self):
+        # Each source's cached objects are released many times over
+        self.assertSameOutput([self.source, (self.source, [2])], streaming=True, memory_limit=1)
+
+    def test_dedup(self):
+        self.assertSameOutput([self.source, self.source], dedup=True)
+
+
+if __name__ == '__main__':
+    unittest.main()